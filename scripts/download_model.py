@@ -5,34 +5,103 @@ Download RVC model for Voice Transformer
 
 import os
 import sys
+import errno
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
 import shutil
 import zipfile
 import hashlib
+import mmap
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 import json
 
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
 # Default model URL and file info
 # Note: This is a placeholder URL. In a real implementation, this would point to an actual model file.
 DEFAULT_MODEL_URL = "https://example.com/models/vietnamese_female_voice_model.zip"
 DEFAULT_MODEL_SIZE = 300 * 1024 * 1024  # 300 MB
-DEFAULT_MODEL_HASH = "0123456789abcdef0123456789abcdef"  # Example MD5 hash
+# Example MD5 hash. A 64-character digest is treated as BLAKE3; use an
+# "sha256:<digest>" prefix to verify with SHA-256 instead.
+DEFAULT_MODEL_HASH = "0123456789abcdef0123456789abcdef"
+
+# Files at least this large are BLAKE3-hashed via mmap on all cores; below it
+# thread start-up costs more than it saves
+BLAKE3_PARALLEL_THRESHOLD = 1 << 20  # 1 MiB
+
+# Suffix of the sidecar file recording a previously verified hash
+VERIFIED_HASH_SUFFIX = ".verified"
+# Keys a verified hash record must contain
+VERIFIED_HASH_KEYS = frozenset({'algorithm', 'digest', 'size', 'mtime_ns'})
+
+# Read/write block size for downloads; large blocks keep per-chunk Python overhead negligible
+DOWNLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+# Downloaded blocks that may be waiting for the disk writer
+WRITE_QUEUE_DEPTH = 16
+
+# Shared HTTP session so retries and multi-file downloads reuse TCP/TLS connections
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+def _write_chunks(f, chunks, failed, file_hash=None):
+    """
+    Write and hash downloaded blocks until a None sentinel is received
+    
+    Runs on a separate thread so disk writes and hashing overlap with network
+    reads. After an error failed is set so the producer stops downloading, and
+    the queue is still drained so the producer never blocks.
+    
+    Args:
+        f (file): Destination file opened for binary writing
+        chunks (queue.Queue): Queue of bytes blocks, terminated by None
+        failed (threading.Event): Set when a write fails
+        file_hash (object, optional): Hash object to update. Defaults to None.
+    """
+    error = None
+    while True:
+        chunk = chunks.get()
+        if chunk is None:
+            break
+        if error is None:
+            try:
+                f.write(chunk)
+                if file_hash is not None:
+                    file_hash.update(chunk)
+            except Exception as e:
+                error = e
+                failed.set()
+    if error is not None:
+        raise error
 
-def download_file(url, destination, expected_size=None):
+def download_file(url, destination, expected_size=None, hash_algorithm=None):
     """
     Download a file with progress display
     
+    Network reads run on the calling thread while a writer thread stores (and,
+    when hash_algorithm is given, hashes) the blocks, so the file does not have
+    to be read back from disk for verification.
+    
     Args:
         url (str): URL to download
         destination (str): Destination file path
         expected_size (int, optional): Expected file size in bytes. Defaults to None.
+        hash_algorithm (str, optional): Algorithm to hash the download with. Defaults to None (no hashing).
     
     Returns:
-        bool: True if successful, False otherwise
+        tuple: (success, hex digest or None)
     """
     try:
-        response = requests.get(url, stream=True)
+        file_hash = new_hasher(hash_algorithm) if hash_algorithm else None
+        
+        response = _session.get(url, stream=True)
         response.raise_for_status()
         
         # Get file size if not provided
@@ -42,11 +111,24 @@ def download_file(url, destination, expected_size=None):
         progress_bar = tqdm(total=file_size, unit='B', unit_scale=True, desc="Downloading")
         
         # Download file
-        with open(destination, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    progress_bar.update(len(chunk))
+        chunks = queue.Queue(maxsize=WRITE_QUEUE_DEPTH)
+        with open(destination, 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as f, \
+                ThreadPoolExecutor(max_workers=1) as writer:
+            failed = threading.Event()
+            pending = writer.submit(_write_chunks, f, chunks, failed, file_hash)
+            try:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    # The writer failed (e.g. disk full); its error is raised below
+                    if failed.is_set():
+                        break
+                    if chunk:
+                        chunks.put(chunk)
+                        progress_bar.update(len(chunk))
+            finally:
+                chunks.put(None)
+                # Release the connection, including after an early stop
+                response.close()
+            pending.result()
         
         progress_bar.close()
         
@@ -55,19 +137,197 @@ def download_file(url, destination, expected_size=None):
         if expected_size and actual_size != expected_size:
             print(f"WARNING: Downloaded file size ({actual_size} bytes) does not match expected size ({expected_size} bytes)")
         
-        return True
+        return True, file_hash.hexdigest() if file_hash is not None else None
     
     except Exception as e:
         print(f"Error downloading file: {e}")
+        return False, None
+
+def parse_expected_hash(expected_hash):
+    """
+    Split an expected hash into its algorithm and hex digest
+    
+    Accepts an explicit "algorithm:digest" form (e.g. "sha256:...") or a bare hex
+    digest, in which case 32 characters means MD5 (kept for compatibility) and 64
+    characters means BLAKE3.
+    
+    Args:
+        expected_hash (str): Expected hash
+    
+    Returns:
+        tuple: (algorithm, hex_digest)
+    """
+    if ':' in expected_hash:
+        algorithm, digest = expected_hash.split(':', 1)
+        return algorithm.lower(), digest.lower()
+    
+    digest = expected_hash.lower()
+    if len(digest) == 32:
+        return "md5", digest
+    if len(digest) == 64:
+        return "blake3", digest
+    raise ValueError(f"Cannot infer hash algorithm from a {len(digest)}-character digest")
+
+def new_hasher(algorithm):
+    """
+    Create an incremental hash object
+    
+    Args:
+        algorithm (str): "blake3" or any hashlib algorithm name
+    
+    Returns:
+        object: Hash object with update() and hexdigest()
+    """
+    if algorithm == "blake3":
+        if blake3 is None:
+            raise RuntimeError("BLAKE3 hash requested but the blake3 package is not installed")
+        return blake3.blake3()
+    return hashlib.new(algorithm)
+
+def compute_file_hash(file_path, algorithm="md5"):
+    """
+    Compute the hash of a file
+    
+    Used when verifying files already on disk; downloads are hashed as they
+    stream in. BLAKE3 hashes files of at least BLAKE3_PARALLEL_THRESHOLD bytes
+    using all cores and SIMD. hashlib algorithms use hashlib.file_digest (Python 3.11+) so
+    the read/update loop runs in C; SHA-256 picks up SHA-NI on CPUs that support
+    it. Everything else hashes a memory-mapped view of the file on the calling
+    thread.
+    
+    Args:
+        file_path (str): Path to file
+        algorithm (str, optional): "blake3" or any hashlib algorithm name. Defaults to "md5".
+    
+    Returns:
+        str: Hex digest of the file contents
+    """
+    if algorithm == "blake3" and os.path.getsize(file_path) >= BLAKE3_PARALLEL_THRESHOLD:
+        if blake3 is None:
+            raise RuntimeError("BLAKE3 hash requested but the blake3 package is not installed")
+        file_hash = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        file_hash.update_mmap(file_path)
+        return file_hash.hexdigest()
+    
+    with open(file_path, "rb") as f:
+        if algorithm != "blake3" and hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, algorithm).hexdigest()
+        
+        file_hash = new_hasher(algorithm)
+        # mmap cannot map an empty file
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                file_hash.update(mm)
+        return file_hash.hexdigest()
+
+def hash_files_parallel(paths, algorithms, max_workers=None):
+    """
+    Compute hashes of several files concurrently
+    
+    Used by verify_file for files without a valid verification record. hashlib
+    and blake3 release the GIL while hashing large buffers, so independent files
+    (e.g. model shards) are hashed on separate cores; a large BLAKE3 file is
+    additionally split across cores by compute_file_hash itself.
+    
+    Args:
+        paths (list): Paths of files to hash
+        algorithms (list): Hash algorithm for each path
+        max_workers (int, optional): Number of worker threads. Defaults to None (one per CPU).
+    
+    Returns:
+        list: Hex digests in the same order as paths
+    """
+    if len(paths) <= 1:
+        return [compute_file_hash(path, algorithm) for path, algorithm in zip(paths, algorithms)]
+    
+    workers = min(len(paths), max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(compute_file_hash, paths, algorithms))
+
+def verify_hash(file_hash, expected_hash):
+    """
+    Compare an already computed digest against an expected hash
+    
+    Args:
+        file_hash (str): Hex digest of the file
+        expected_hash (str): Expected hash (see parse_expected_hash)
+    
+    Returns:
+        bool: True if the hashes match, False otherwise
+    """
+    print("Verifying file integrity...")
+    
+    algorithm, expected = parse_expected_hash(expected_hash)
+    if file_hash != expected:
+        print(f"WARNING: File {algorithm} hash ({file_hash}) does not match expected hash ({expected})")
         return False
+    
+    print("File integrity verified successfully")
+    return True
 
-def verify_file(file_path, expected_hash=None):
+def read_verified_hash(file_path, algorithm):
     """
-    Verify file integrity using MD5 hash
+    Look up a previously verified hash for a file
+    
+    The sidecar records the file's size and modification time alongside the
+    digest; it is only trusted while both still match, so an unchanged file does
+    not need to be hashed again.
     
     Args:
         file_path (str): Path to file
-        expected_hash (str, optional): Expected MD5 hash. Defaults to None.
+        algorithm (str): Hash algorithm
+    
+    Returns:
+        str: Recorded hex digest, or None if there is no valid record
+    """
+    try:
+        with open(file_path + VERIFIED_HASH_SUFFIX, 'r') as f:
+            record = json.load(f)
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    
+    # Anything but a complete record (e.g. a hand-edited sidecar) is treated as stale
+    if not isinstance(record, dict) or not VERIFIED_HASH_KEYS <= record.keys():
+        return None
+    if (record.get('algorithm') != algorithm or record.get('size') != stat.st_size
+            or record.get('mtime_ns') != stat.st_mtime_ns):
+        return None
+    return record.get('digest')
+
+def write_verified_hash(file_path, algorithm, digest):
+    """
+    Record a verified hash for a file (see read_verified_hash)
+    
+    Args:
+        file_path (str): Path to file
+        algorithm (str): Hash algorithm
+        digest (str): Verified hex digest
+    """
+    try:
+        stat = os.stat(file_path)
+        record = {
+            'algorithm': algorithm,
+            'digest': digest,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns
+        }
+        with open(file_path + VERIFIED_HASH_SUFFIX, 'w') as f:
+            json.dump(record, f)
+    except OSError as e:
+        print(f"WARNING: Could not record verified hash for {file_path}: {e}")
+
+def verify_file(file_path, expected_hash=None):
+    """
+    Verify file integrity using an MD5, BLAKE3 or SHA-256 hash
+    
+    Files whose matching hash was already verified and that have not changed
+    since are not hashed again.
+    
+    Args:
+        file_path (str or list): Path to file, or a list of paths to verify in parallel
+        expected_hash (str or list, optional): Expected hash (see parse_expected_hash),
+            or a list of hashes matching file_path. Defaults to None.
     
     Returns:
         bool: True if hash matches or no hash check requested, False otherwise
@@ -78,17 +338,35 @@ def verify_file(file_path, expected_hash=None):
     print("Verifying file integrity...")
     
     try:
-        md5_hash = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                md5_hash.update(chunk)
-        
-        file_hash = md5_hash.hexdigest()
+        if isinstance(file_path, (list, tuple)):
+            paths = list(file_path)
+            expected_hashes = list(expected_hash)
+        else:
+            paths = [file_path]
+            expected_hashes = [expected_hash]
         
-        if file_hash != expected_hash:
-            print(f"WARNING: File hash ({file_hash}) does not match expected hash ({expected_hash})")
+        if len(paths) != len(expected_hashes):
+            print(f"Error verifying file: got {len(expected_hashes)} hashes for {len(paths)} files")
             return False
         
+        algorithms, digests = zip(*(parse_expected_hash(h) for h in expected_hashes))
+        
+        # Only hash files without a still-valid verification record
+        file_hashes = [read_verified_hash(path, algorithm) for path, algorithm in zip(paths, algorithms)]
+        stale = [i for i, (file_hash, expected) in enumerate(zip(file_hashes, digests)) if file_hash != expected]
+        if stale:
+            computed = hash_files_parallel([paths[i] for i in stale], [algorithms[i] for i in stale])
+            for i, file_hash in zip(stale, computed):
+                file_hashes[i] = file_hash
+        
+        for path, algorithm, file_hash, expected in zip(paths, algorithms, file_hashes, digests):
+            if file_hash != expected:
+                print(f"WARNING: File {algorithm} hash ({file_hash}) of {path} does not match expected hash ({expected})")
+                return False
+        
+        for i in stale:
+            write_verified_hash(paths[i], algorithms[i], digests[i])
+        
         print("File integrity verified successfully")
         return True
     
@@ -96,13 +374,54 @@ def verify_file(file_path, expected_hash=None):
         print(f"Error verifying file: {e}")
         return False
 
-def extract_zip(zip_path, extract_dir):
+def _extract_members(zip_path, members, extract_dir):
+    """
+    Extract a subset of ZIP members using a private archive handle
+    
+    Each worker opens its own ZipFile so file cursors are not shared between threads.
+    
+    Args:
+        zip_path (str): Path to ZIP file
+        members (list): ZipInfo entries to extract
+        extract_dir (str): Directory to extract to
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for member in members:
+            zip_ref.extract(member, extract_dir)
+
+def move_file(src, dst):
+    """
+    Move a file into place, overwriting any existing file
+    
+    os.replace is a metadata-only rename on the same filesystem (and, unlike
+    os.rename on Windows, overwrites an existing destination). Across filesystems
+    it falls back to shutil.copyfile, which uses kernel-space copies where the
+    platform supports them.
+    
+    Args:
+        src (str): Source file path
+        dst (str): Destination file path
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.copyfile(src, dst)
+        os.remove(src)
+
+def extract_zip(zip_path, extract_dir, max_workers=None):
     """
     Extract ZIP file
     
+    Entries are independent, so they are spread across a thread pool; zlib
+    releases the GIL while inflating, which lets decompression and disk writes
+    of different entries overlap.
+    
     Args:
         zip_path (str): Path to ZIP file
         extract_dir (str): Directory to extract to
+        max_workers (int, optional): Number of worker threads. Defaults to None (one per CPU).
     
     Returns:
         bool: True if successful, False otherwise
@@ -111,7 +430,21 @@ def extract_zip(zip_path, extract_dir):
         print(f"Extracting {zip_path} to {extract_dir}...")
         
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(extract_dir)
+            members = zip_ref.infolist()
+        
+        workers = min(len(members), max_workers or os.cpu_count() or 1)
+        
+        if workers <= 1:
+            _extract_members(zip_path, members, extract_dir)
+        else:
+            # Deal entries round-robin, largest first, so workers get similar amounts of data
+            members.sort(key=lambda member: member.file_size, reverse=True)
+            batches = [members[i::workers] for i in range(workers)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_extract_members, zip_path, batch, extract_dir)
+                           for batch in batches]
+                for future in futures:
+                    future.result()
         
         print("Extraction completed successfully")
         return True
@@ -193,6 +526,12 @@ def main():
     
     # Check if model already exists
     if os.path.exists(model_path):
+        # A downloaded (non-ZIP) model is the file the expected hash describes, so
+        # an intact copy can be kept without prompting or downloading it again
+        if args.verify and not args.simulate and not args.url.endswith('.zip') \
+                and verify_file(model_path, DEFAULT_MODEL_HASH):
+            print(f"Model already present and verified: {model_path}")
+            return
         overwrite = input("Model file already exists. Overwrite? (y/n): ").lower() == 'y'
         if not overwrite:
             print("Download cancelled")
@@ -207,11 +546,12 @@ def main():
         
         # Download model
         print(f"Downloading model from {args.url}...")
-        success = download_file(args.url, temp_file, DEFAULT_MODEL_SIZE)
+        hash_algorithm = parse_expected_hash(DEFAULT_MODEL_HASH)[0] if args.verify else None
+        success, file_hash = download_file(args.url, temp_file, DEFAULT_MODEL_SIZE, hash_algorithm)
         
         if success and args.verify:
-            # Verify downloaded file
-            success = verify_file(temp_file, DEFAULT_MODEL_HASH)
+            # Verify the hash computed during download instead of re-reading the file
+            success = verify_hash(file_hash, DEFAULT_MODEL_HASH)
         
         if success:
             # If file is a ZIP archive, extract it
@@ -222,7 +562,10 @@ def main():
                     os.remove(temp_file)
             else:
                 # Move downloaded file to final location
-                shutil.move(temp_file, model_path)
+                move_file(temp_file, model_path)
+                if args.verify:
+                    # Record the verified hash so the next run can skip rehashing
+                    write_verified_hash(model_path, *parse_expected_hash(DEFAULT_MODEL_HASH))
         else:
             # Clean up partial download
             if os.path.exists(temp_file):
@@ -21,11 +21,13 @@ def list_audio_devices():
         device_count = pa.get_device_count()
         print(f"Found {device_count} audio devices\n")
         
+        # Query each device once and filter the cached results below
+        device_infos = [pa.get_device_info_by_index(i) for i in range(device_count)]
+        
         # List input devices
         print("Input Devices:")
         print("-------------")
-        for i in range(device_count):
-            device_info = pa.get_device_info_by_index(i)
+        for i, device_info in enumerate(device_infos):
             if device_info['maxInputChannels'] > 0:
                 print(f"[{i}] {device_info['name']}")
                 print(f"    Channels: {device_info['maxInputChannels']}")
@@ -35,8 +37,7 @@ def list_audio_devices():
         # List output devices
         print("Output Devices:")
         print("--------------")
-        for i in range(device_count):
-            device_info = pa.get_device_info_by_index(i)
+        for i, device_info in enumerate(device_infos):
             if device_info['maxOutputChannels'] > 0:
                 print(f"[{i}] {device_info['name']}")
                 print(f"    Channels: {device_info['maxOutputChannels']}")
@@ -47,12 +47,18 @@ def test_audio(input_device=None, output_device=None, duration=5, sample_rate=16
         channels = 1
         format = pyaudio.paInt16
         
-        # Buffer to store audio data
-        audio_data = []
+        # Preallocated buffer to store audio data, with one chunk of headroom
+        # since the recording may overrun the requested duration slightly
+        recorded = np.empty(duration * sample_rate * channels + chunk_size * channels, dtype=np.int16)
+        write_idx = [0]
         
         # Define callback function for input stream
         def callback(in_data, frame_count, time_info, status):
-            audio_data.append(in_data)
+            frames = np.frombuffer(in_data, dtype=np.int16)
+            start = write_idx[0]
+            n = min(len(frames), len(recorded) - start)
+            recorded[start:start + n] = frames[:n]
+            write_idx[0] = start + n
             return (in_data, pyaudio.paContinue)
         
         # Open input stream
@@ -79,14 +85,16 @@ def test_audio(input_device=None, output_device=None, duration=5, sample_rate=16
         
         print("Recording finished")
         
-        # Combine all audio chunks
-        recorded_audio = b''.join(audio_data)
-        
-        # Convert to numpy array for analysis
-        audio_array = np.frombuffer(recorded_audio, dtype=np.int16)
+        # Recorded samples
+        audio_array = recorded[:write_idx[0]]
         
         # Analyze audio
-        max_amp = np.max(np.abs(audio_array))
+        # Two in-place reductions instead of materializing |x|; this also avoids
+        # np.abs overflowing on -32768 in int16
+        if len(audio_array) > 0:
+            max_amp = max(int(audio_array.max()), -int(audio_array.min()))
+        else:
+            max_amp = 0
         max_amp_db = 20 * np.log10(max_amp / 32767) if max_amp > 0 else -100
         
         print("\nAudio Analysis:")
@@ -115,10 +123,8 @@ def test_audio(input_device=None, output_device=None, duration=5, sample_rate=16
         # Start playback
         output_stream.start_stream()
         
-        # Write audio data in chunks
-        for i in range(0, len(recorded_audio), chunk_size * 2):
-            chunk = recorded_audio[i:i + chunk_size * 2]
-            output_stream.write(chunk)
+        # Write all audio data in one call; PyAudio splits it into device buffers itself
+        output_stream.write(audio_array.tobytes())
         
         # Stop playback
         output_stream.stop_stream()
@@ -10,6 +10,11 @@ import torch
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def verify_model(model_path, verbose=False):
     """
     Verify RVC model file
@@ -43,8 +48,9 @@ def verify_model(model_path, verbose=False):
     if os.path.exists(config_path):
         print(f"Found model configuration at {config_path}")
         try:
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            with open(config_path, 'rb') as f:
+                data = f.read()
+            config = orjson.loads(data) if orjson is not None else json.loads(data)
             
             print("\nModel Information:")
             print(f"Name: {config.get('model_name', 'Unknown')}")
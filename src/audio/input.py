@@ -11,19 +11,29 @@ from collections import deque
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of chunks waiting to be consumed
+QUEUE_SIZE = 100
+# Scale factor from int16 samples to float32 in [-1, 1)
+INT16_SCALE = np.float32(1.0 / 32768.0)
+# Ring buffer slots; twice the queue size so a chunk handed to a consumer is not
+# overwritten until another full queue's worth of audio has arrived
+RING_SLOTS = 2 * QUEUE_SIZE
+# How long an enumerated device list is reused before querying PortAudio again
+DEVICE_CACHE_TTL = 1.0
+
 class AudioInput:
     """
     Audio input handler class for capturing microphone input
     """
     
-    def __init__(self, device_index=None, sample_rate=16000, buffer_size=512, channels=1):
+    def __init__(self, device_index=None, sample_rate=16000, buffer_size=1024, channels=1):
         """
         Initialize the audio input handler
         
         Args:
             device_index (int, optional): Index of input device. Defaults to None (system default).
             sample_rate (int, optional): Sample rate in Hz. Defaults to 16000.
-            buffer_size (int, optional): Buffer size in samples. Defaults to 512.
+            buffer_size (int, optional): Buffer size in samples. Defaults to 1024.
             channels (int, optional): Number of channels. Defaults to 1 (mono).
         """
         self.device_index = device_index
@@ -35,16 +45,33 @@ class AudioInput:
         self.audio = pyaudio.PyAudio()
         self.stream = None
         self.active = False
-        self.data_queue = deque(maxlen=100)  # Store up to 100 audio chunks
-        self.lock = threading.Lock()
+        # Ring slot indices of pending chunks. deque(maxlen) drops the oldest chunk
+        # when the consumer falls behind, and append/popleft are atomic under the
+        # GIL, so the real-time callback takes no queue lock
+        self.data_queue = deque(maxlen=QUEUE_SIZE)
+        self.data_ready = threading.Event()
+        
+        # Preallocated float32 ring buffer the stream callback converts into, so the
+        # real-time thread does not allocate a new array per chunk and downstream
+        # DSP receives samples that are already float32
+        self.ring = np.zeros((RING_SLOTS, buffer_size * channels), dtype=np.float32)
+        self.ring_lengths = np.zeros(RING_SLOTS, dtype=np.int64)
+        self.write_idx = 0
+        
+        # Bound once so the real-time callback skips the attribute lookups
+        self._warn = logger.warning
+        
+        # Cached result of list_devices()
+        self._devices_cache = None
+        self._devices_cache_ts = 0.0
         
         # Check if the device exists
         if device_index is not None:
             try:
                 device_info = self.audio.get_device_info_by_index(device_index)
-                logger.info(f"Using input device: {device_info['name']}")
+                logger.info("Using input device: %s", device_info['name'])
             except IOError:
-                logger.warning(f"Input device with index {device_index} not found. Using default device.")
+                logger.warning("Input device with index %s not found. Using default device.", device_index)
                 self.device_index = None
     
     def callback(self, in_data, frame_count, time_info, status):
@@ -61,14 +88,19 @@ class AudioInput:
             tuple: (None, pyaudio.paContinue)
         """
         if status:
-            logger.warning(f"Audio input status: {status}")
+            self._warn("Audio input status: %s", status)
         
-        # Convert to numpy array
-        audio_data = np.frombuffer(in_data, dtype=np.int16)
+        # Convert int16 wire format to float32 directly into the next ring slot
+        samples = np.frombuffer(in_data, dtype=np.int16)
+        idx = self.write_idx
+        n = min(len(samples), self.ring.shape[1])
+        np.multiply(samples[:n], INT16_SCALE, out=self.ring[idx, :n])
+        self.ring_lengths[idx] = n
+        self.write_idx = (idx + 1) % RING_SLOTS
         
-        # Add to queue
-        with self.lock:
-            self.data_queue.append(audio_data)
+        # Add to queue (the oldest chunk is dropped if it is full) and wake the consumer
+        self.data_queue.append(idx)
+        self.data_ready.set()
         
         return (None, pyaudio.paContinue)
     
@@ -93,7 +125,7 @@ class AudioInput:
             self.active = True
             logger.info("Audio input started")
         except Exception as e:
-            logger.error(f"Error starting audio input: {e}")
+            logger.error("Error starting audio input: %s", e)
             raise
     
     def stop(self):
@@ -105,6 +137,30 @@ class AudioInput:
             self.active = False
             logger.info("Audio input stopped")
     
+    def set_device(self, device_index):
+        """
+        Switch to another input device
+        
+        Reuses the existing PyAudio instance instead of creating a new handler,
+        which would re-enumerate every host API. The stream is reopened on the
+        new device if it was running.
+        
+        Args:
+            device_index (int): Index of input device
+        """
+        was_active = self.active
+        
+        if self.stream is not None:
+            self.stop()
+            self.stream.close()
+            self.stream = None
+        
+        self.device_index = device_index
+        logger.info("Input device set to %s", device_index)
+        
+        if was_active:
+            self.start()
+    
     def close(self):
         """
         Close audio input stream and release resources
@@ -124,30 +180,49 @@ class AudioInput:
         """
         Get the next audio chunk from the queue
         
+        The returned array is a view into the input ring buffer; it stays valid
+        until the ring wraps around, so copy it if it needs to be kept longer
+        (TransformationPipeline.add_audio does).
+        
         Args:
             timeout (float, optional): Timeout in seconds. Defaults to 0.5.
             
         Returns:
-            numpy.ndarray: Audio data, or None if no data is available
+            numpy.ndarray: Audio data (float32 normalized to [-1, 1]), or None if no data is available
         """
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            with self.lock:
-                if len(self.data_queue) > 0:
-                    return self.data_queue.popleft()
-            time.sleep(0.01)
+        deadline = time.monotonic() + timeout
         
-        logger.warning("Timeout while waiting for audio input")
-        return None
+        while True:
+            try:
+                idx = self.data_queue.popleft()
+                return self.ring[idx, :self.ring_lengths[idx]]
+            except IndexError:
+                pass
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning("Timeout while waiting for audio input")
+                return None
+            
+            # Re-check after clearing so a chunk appended in between is not missed
+            self.data_ready.clear()
+            if not self.data_queue:
+                self.data_ready.wait(remaining)
     
     def list_devices(self):
         """
         List available audio input devices
         
+        The result is cached for DEVICE_CACHE_TTL seconds, since enumerating
+        devices goes through PortAudio for every device.
+        
         Returns:
             list: List of dictionaries with device information
         """
+        now = time.monotonic()
+        if self._devices_cache is not None and now - self._devices_cache_ts < DEVICE_CACHE_TTL:
+            return list(self._devices_cache)
+        
         devices = []
         
         for i in range(self.audio.get_device_count()):
@@ -160,7 +235,10 @@ class AudioInput:
                     'sample_rate': int(device_info['defaultSampleRate'])
                 })
         
-        return devices
+        self._devices_cache = devices
+        self._devices_cache_ts = now
+        
+        return list(devices)
         
     def is_active(self):
         """
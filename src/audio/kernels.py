@@ -0,0 +1,115 @@
+"""
+Numba-compiled DSP kernels for Voice Transformer
+
+Numba is optional: when it is not installed HAVE_NUMBA is False, the kernels
+are not defined and callers fall back to their NumPy implementations.
+
+Each kernel is declared with an explicit signature, so it is compiled once at
+import for exactly the dtypes and memory layouts their callers pass. The
+1-D audio kernels take C-contiguous arrays ([::1]), which lets LLVM vectorize
+their loops without stride checks. Callers must pass matching arrays; there
+is no lazy fallback compilation for other types.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+if HAVE_NUMBA:
+    # librosa returns Fortran-ordered STFTs, so the 2-D layout is left generic
+    @njit('void(complex64[:, :], float32[::1], complex64[:, :])',
+          parallel=True, fastmath=True, cache=True, nogil=True, boundscheck=False)
+    def spectral_subtract(stft, noise_floor, out):
+        """
+        Subtract a noise floor from STFT magnitudes, keeping the phase
+
+        Fuses magnitude, subtraction and reconstruction into one pass over the STFT.
+
+        Args:
+            stft (numpy.ndarray): Complex STFT matrix (freq x frames)
+            noise_floor (numpy.ndarray): Magnitude to subtract per frequency bin
+            out (numpy.ndarray): Complex output matrix, same shape as stft
+        """
+        n_freq, n_frames = stft.shape
+        for t in prange(n_frames):
+            for f in range(n_freq):
+                v = stft[f, t]
+                mag = np.sqrt(v.real * v.real + v.imag * v.imag)
+                reduced = mag - noise_floor[f]
+                if reduced > 0.0:
+                    # reduced > 0 implies mag > 0, so the division is safe
+                    out[f, t] = v * (reduced / mag)
+                else:
+                    out[f, t] = 0.0
+
+    @njit('void(float32[::1], float32, float32)',
+          fastmath=True, cache=True, nogil=True, boundscheck=False)
+    def normalize_inplace(x, target, floor):
+        """
+        Scale audio in place so its peak amplitude equals target
+
+        Finds the peak and scales in two tight loops without a temporary |x|
+        array. Audio whose peak is not above floor is left unchanged.
+
+        Args:
+            x (numpy.ndarray): Contiguous float32 audio data, modified in place
+            target (float): Target peak amplitude
+            floor (float): Peak amplitude at or below which audio is left as is
+        """
+        m = 0.0
+        for i in range(x.shape[0]):
+            a = abs(x[i])
+            if a > m:
+                m = a
+        if m > floor:
+            g = target / m
+            for i in range(x.shape[0]):
+                x[i] *= g
+
+    @njit('void(float32[::1], int16[::1])',
+          fastmath=True, cache=True, nogil=True, boundscheck=False)
+    def float_to_int16_saturate(x, out):
+        """
+        Clip float audio to [-1, 1] and convert it to int16
+
+        Not parallelized: audio chunks are a few thousand samples, below the
+        point where splitting the loop across threads pays off.
+
+        Args:
+            x (numpy.ndarray): float32 audio data
+            out (numpy.ndarray): int16 output buffer of the same length
+        """
+        for i in range(x.shape[0]):
+            v = x[i]
+            if v > 1.0:
+                v = 1.0
+            elif v < -1.0:
+                v = -1.0
+            out[i] = np.int16(v * 32767.0)
+
+    @njit('void(float32[::1], int64[::1], float32[::1], float32[::1])',
+          fastmath=True, cache=True, nogil=True, boundscheck=False)
+    def resample_transform(audio, indices, sin_table, out):
+        """
+        Resample, add the formant sine table and clip in one pass
+
+        Used by the pipeline's simulated transformation. Not parallelized, for
+        the same reason as float_to_int16_saturate.
+
+        Args:
+            audio (numpy.ndarray): float32 input audio
+            indices (numpy.ndarray): Input sample index for each output sample
+            sin_table (numpy.ndarray): float32 value added to each output sample
+            out (numpy.ndarray): float32 output buffer, same length as indices
+        """
+        for i in range(indices.shape[0]):
+            v = audio[indices[i]] + sin_table[i]
+            if v > 0.99:
+                v = 0.99
+            elif v < -0.99:
+                v = -0.99
+            out[i] = v
\ No newline at end of file
@@ -4,26 +4,33 @@ Audio output module for Voice Transformer
 
 import numpy as np
 import pyaudio
-import threading
 import logging
 import time
-from collections import deque
 
 logger = logging.getLogger(__name__)
 
+# Number of buffer_size chunks the output ring buffer can hold
+RING_CHUNKS = 100
+# Scale factor from float32 in [-1, 1] to int16
+FLOAT_TO_INT16 = np.float32(32767.0)
+# Number of preallocated int16 chunk buffers handed out by get_buffer()
+POOL_SIZE = 4
+# How long an enumerated device list is reused before querying PortAudio again
+DEVICE_CACHE_TTL = 1.0
+
 class AudioOutput:
     """
     Audio output handler class for playing transformed audio
     """
     
-    def __init__(self, device_index=None, sample_rate=16000, buffer_size=512, channels=1):
+    def __init__(self, device_index=None, sample_rate=16000, buffer_size=1024, channels=1):
         """
         Initialize the audio output handler
         
         Args:
             device_index (int, optional): Index of output device. Defaults to None (system default).
             sample_rate (int, optional): Sample rate in Hz. Defaults to 16000.
-            buffer_size (int, optional): Buffer size in samples. Defaults to 512.
+            buffer_size (int, optional): Buffer size in samples. Defaults to 1024.
             channels (int, optional): Number of channels. Defaults to 1 (mono).
         """
         self.device_index = device_index
@@ -35,16 +42,41 @@ class AudioOutput:
         self.audio = pyaudio.PyAudio()
         self.stream = None
         self.active = False
-        self.data_queue = deque(maxlen=100)  # Store up to 100 audio chunks
-        self.lock = threading.Lock()
+        
+        # Single-producer/single-consumer ring of samples. play_audio() only
+        # advances write_pos and the stream callback only advances read_pos; each
+        # is a single attribute store under the GIL, so the callback takes no lock.
+        # The buffer is stored twice back to back, so any read of up to
+        # ring_capacity samples is one contiguous slice.
+        self.ring_capacity = RING_CHUNKS * buffer_size * channels
+        self.buf = np.zeros(2 * self.ring_capacity, dtype=np.int16)
+        self.write_pos = 0  # Total samples written
+        self.read_pos = 0  # Total samples played
+        
+        # Silence returned on underrun, keyed by frame count, so the real-time
+        # callback does not allocate a new buffer each time
+        self._silence = {buffer_size: bytes(2 * buffer_size * channels)}
+        
+        # Free list of preallocated chunk buffers the producer can write into
+        # instead of allocating a new int16 array per chunk
+        self._pool = [np.empty(buffer_size * channels, dtype=np.int16) for _ in range(POOL_SIZE)]
+        # Every pool buffer, kept alive so membership is checked by identity
+        # (an id() of a dropped buffer could be reused by an unrelated array)
+        self._all_buffers = tuple(self._pool)
+        # Scratch for scaling float32 chunks before conversion to int16
+        self._scale_buf = np.empty(buffer_size * channels, dtype=np.float32)
+        
+        # Cached result of list_devices()
+        self._devices_cache = None
+        self._devices_cache_ts = 0.0
         
         # Check if the device exists
         if device_index is not None:
             try:
                 device_info = self.audio.get_device_info_by_index(device_index)
-                logger.info(f"Using output device: {device_info['name']}")
+                logger.info("Using output device: %s", device_info['name'])
             except IOError:
-                logger.warning(f"Output device with index {device_index} not found. Using default device.")
+                logger.warning("Output device with index %s not found. Using default device.", device_index)
                 self.device_index = None
     
     def callback(self, in_data, frame_count, time_info, status):
@@ -61,23 +93,30 @@ class AudioOutput:
             tuple: (audio_data, pyaudio.paContinue)
         """
         if status:
-            logger.warning(f"Audio output status: {status}")
-        
-        # Get audio data from queue
-        with self.lock:
-            if len(self.data_queue) > 0:
-                audio_data = self.data_queue.popleft()
-                # If the audio data is shorter than requested, pad with zeros
-                if len(audio_data) < frame_count:
-                    audio_data = np.pad(audio_data, (0, frame_count - len(audio_data)), 'constant')
-                # If the audio data is longer than requested, truncate
-                elif len(audio_data) > frame_count:
-                    audio_data = audio_data[:frame_count]
-                
-                return (audio_data.tobytes(), pyaudio.paContinue)
-            else:
-                # No data available, output silence
-                return (np.zeros(frame_count, dtype=np.int16).tobytes(), pyaudio.paContinue)
+            logger.warning("Audio output status: %s", status)
+        
+        read_pos = self.read_pos
+        available = self.write_pos - read_pos
+        if available == 0:
+            # No data available, output silence
+            silence = self._silence.get(frame_count)
+            if silence is None:
+                silence = self._silence[frame_count] = bytes(2 * frame_count * self.channels)
+            return (silence, pyaudio.paContinue)
+        
+        needed = frame_count * self.channels
+        n = min(available, needed)
+        start = read_pos % self.ring_capacity
+        
+        # tobytes() copies the samples, so they can be released to the producer afterwards
+        out_data = self.buf[start:start + n].tobytes()
+        self.read_pos = read_pos + n
+        
+        # If less audio is buffered than requested, pad with silence
+        if n < needed:
+            out_data += bytes(2 * (needed - n))
+        
+        return (out_data, pyaudio.paContinue)
     
     def start(self):
         """
@@ -100,7 +139,7 @@ class AudioOutput:
             self.active = True
             logger.info("Audio output started")
         except Exception as e:
-            logger.error(f"Error starting audio output: {e}")
+            logger.error("Error starting audio output: %s", e)
             raise
     
     def stop(self):
@@ -112,6 +151,30 @@ class AudioOutput:
             self.active = False
             logger.info("Audio output stopped")
     
+    def set_device(self, device_index):
+        """
+        Switch to another output device
+        
+        Reuses the existing PyAudio instance instead of creating a new handler,
+        which would re-enumerate every host API. The stream is reopened on the
+        new device if it was running.
+        
+        Args:
+            device_index (int): Index of output device
+        """
+        was_active = self.active
+        
+        if self.stream is not None:
+            self.stop()
+            self.stream.close()
+            self.stream = None
+        
+        self.device_index = device_index
+        logger.info("Output device set to %s", device_index)
+        
+        if was_active:
+            self.start()
+    
     def close(self):
         """
         Close audio output stream and release resources
@@ -127,23 +190,116 @@ class AudioOutput:
         
         logger.info("Audio output closed")
     
+    def get_buffer(self, n=None):
+        """
+        Check out a preallocated int16 buffer to write a chunk into
+        
+        Passing the buffer to play_audio() returns it to the pool once its
+        samples are copied into the ring; release_buffer() returns an unused one.
+        
+        Args:
+            n (int, optional): Number of samples needed. Defaults to None (one chunk).
+            
+        Returns:
+            numpy.ndarray: int16 buffer of n samples (a new array if the pool is
+                empty or n exceeds the chunk size)
+        """
+        chunk_samples = self.buffer_size * self.channels
+        if n is None:
+            n = chunk_samples
+        if n > chunk_samples or not self._pool:
+            return np.empty(n, dtype=np.int16)
+        return self._pool.pop()[:n]
+    
+    def release_buffer(self, buf):
+        """
+        Return a buffer obtained from get_buffer() to the pool
+        
+        Args:
+            buf (numpy.ndarray): Buffer returned by get_buffer()
+        """
+        base = buf if buf.base is None else buf.base
+        if any(base is b for b in self._all_buffers) and all(b is not base for b in self._pool):
+            self._pool.append(base)
+    
     def play_audio(self, audio_data):
         """
         Queue audio data for playback
         
+        Chunks are appended to a continuous sample stream, so the callback plays
+        them back to back regardless of chunk size. If the ring does not have room
+        for the chunk it is dropped, since only the callback may advance the read
+        position.
+        
+        float32 chunks from the transformation pipeline are converted to int16
+        here, at the device boundary, through a pooled buffer.
+        
         Args:
-            audio_data (numpy.ndarray): Audio data to play
+            audio_data (numpy.ndarray): int16 audio data (ideally a buffer from
+                get_buffer()), or float32 samples in [-1, 1]
         """
-        with self.lock:
-            self.data_queue.append(audio_data)
+        if audio_data.dtype == np.float32:
+            audio_data = self._to_int16(audio_data)
+        elif audio_data.dtype != np.int16:
+            raise TypeError(f"play_audio expects int16 or float32 samples, got {audio_data.dtype}")
+        
+        n = len(audio_data)
+        write_pos = self.write_pos
+        if write_pos + n - self.read_pos > self.ring_capacity:
+            logger.debug("Output ring buffer full, dropping audio chunk")
+            self.release_buffer(audio_data)
+            return
+        
+        # Write into both copies of the buffer, splitting at the wrap point
+        capacity = self.ring_capacity
+        start = write_pos % capacity
+        first = min(n, capacity - start)
+        self.buf[start:start + first] = audio_data[:first]
+        self.buf[capacity + start:capacity + start + first] = audio_data[:first]
+        if first < n:
+            rest = n - first
+            self.buf[:rest] = audio_data[first:]
+            self.buf[capacity:capacity + rest] = audio_data[first:]
+        
+        # Publish the samples only after they are written
+        self.write_pos = write_pos + n
+        
+        # The samples now live in the ring, so a pooled buffer can be reused
+        self.release_buffer(audio_data)
+    
+    def _to_int16(self, audio_data):
+        """
+        Convert float32 samples to int16 in a buffer from get_buffer()
+        
+        Args:
+            audio_data (numpy.ndarray): float32 samples in [-1, 1]
+            
+        Returns:
+            numpy.ndarray: int16 samples, clipped to full scale
+        """
+        n = len(audio_data)
+        if n > len(self._scale_buf):
+            self._scale_buf = np.empty(n, dtype=np.float32)
+        scaled = self._scale_buf[:n]
+        np.multiply(audio_data, FLOAT_TO_INT16, out=scaled)
+        samples = self.get_buffer(n)
+        np.clip(scaled, -FLOAT_TO_INT16, FLOAT_TO_INT16, out=samples, casting='unsafe')
+        return samples
     
     def list_devices(self):
         """
         List available audio output devices
         
+        The result is cached for DEVICE_CACHE_TTL seconds, since enumerating
+        devices goes through PortAudio for every device.
+        
         Returns:
             list: List of dictionaries with device information
         """
+        now = time.monotonic()
+        if self._devices_cache is not None and now - self._devices_cache_ts < DEVICE_CACHE_TTL:
+            return list(self._devices_cache)
+        
         devices = []
         
         for i in range(self.audio.get_device_count()):
@@ -156,7 +312,10 @@ class AudioOutput:
                     'sample_rate': int(device_info['defaultSampleRate'])
                 })
         
-        return devices
+        self._devices_cache = devices
+        self._devices_cache_ts = now
+        
+        return list(devices)
         
     def is_active(self):
         """
@@ -171,8 +330,14 @@ class AudioOutput:
         """
         Get the current length of the output queue
         
+        Lock-free: the two positions are plain attribute reads. read_pos is read
+        first, so a concurrent callback can only make the result stale, never
+        negative.
+        
         Returns:
             int: Number of audio chunks in queue
         """
-        with self.lock:
-            return len(self.data_queue) 
\ No newline at end of file
+        read_pos = self.read_pos
+        buffered = self.write_pos - read_pos
+        chunk_samples = self.buffer_size * self.channels
+        return -(-buffered // chunk_samples) 
\ No newline at end of file
@@ -5,16 +5,43 @@ Audio processing module for Voice Transformer
 import numpy as np
 import librosa
 import logging
+import scipy.fft
+from concurrent.futures import ThreadPoolExecutor
 from scipy import signal
 
+from src.audio import kernels
+
 logger = logging.getLogger(__name__)
 
+# scipy.fft transforms float32 input in single precision, unlike numpy.fft
+librosa.set_fftlib(scipy.fft)
+
+# Normalization targets 70% of full scale; quieter peaks are treated as silence
+NORMALIZE_TARGET = np.float32(0.7)
+NORMALIZE_FLOOR = np.float32(0.01)
+
+# Noise floors and chunk RMS levels below this are inaudible, so spectral
+# subtraction is skipped rather than paying for an STFT round trip
+NOISE_ACTIVE_FLOOR = 1e-4
+
+# STFT parameters (librosa defaults), fixed so the cached window always matches
+N_FFT = 2048
+HOP_LENGTH = 512
+
+# Chunks shorter than this are batched before noise reduction, so each STFT
+# covers at least one full window instead of a heavily padded fragment
+NOISE_BATCH_SAMPLES = N_FFT
+
+# Scale factors between int16 samples and float32 in [-1, 1]
+INT16_TO_FLOAT = np.float32(1.0 / 32768.0)
+FLOAT_TO_INT16 = np.float32(32767.0)
+
 class AudioProcessor:
     """
     Audio processor class for preprocessing audio data before transformation
     """
     
-    def __init__(self, sample_rate=16000, normalize=True, noise_reduction=True):
+    def __init__(self, sample_rate=16000, normalize=True, noise_reduction=True, buffer_size=1024):
         """
         Initialize the audio processor
         
@@ -22,36 +49,100 @@ class AudioProcessor:
             sample_rate (int, optional): Sample rate in Hz. Defaults to 16000.
             normalize (bool, optional): Whether to normalize audio. Defaults to True.
             noise_reduction (bool, optional): Whether to apply noise reduction. Defaults to True.
+            buffer_size (int, optional): Expected chunk size in samples, used to size
+                the conversion buffers. Defaults to 1024.
         """
         self.sample_rate = sample_rate
         self.normalize = normalize
         self.noise_reduction = noise_reduction
         
+        # STFT settings with a precomputed float32 window, so librosa does not
+        # rebuild a float64 window and promote the transform on every call
+        self.n_fft = N_FFT
+        self.hop_length = HOP_LENGTH
+        self._window = signal.get_window('hann', self.n_fft).astype(np.float32)
+        
+        # F0 search range for pyin, resolved once instead of parsing note names per call
+        self._fmin = librosa.note_to_hz('C2')
+        self._fmax = librosa.note_to_hz('C6')
+        
+        # Preallocated conversion buffers, grown if a larger chunk arrives
+        self._f32_buf = np.empty(buffer_size, dtype=np.float32)
+        self._clip_buf = np.empty(buffer_size, dtype=np.float32)
+        self._i16_buf = np.empty(buffer_size, dtype=np.int16)
+        
         # Noise profile (will be updated during runtime)
         self.noise_profile = None
         self.noise_threshold = 0.01
+        self.noise_gate = np.float32(2.0)
+        # noise_profile * noise_gate as float32, precomputed for _reduce_noise
+        self._noise_floor = None
+        # Whether the noise floor is high enough for subtraction to matter
+        self._noise_active = False
+        
+        # Small chunks waiting for noise reduction, and reduced samples waiting
+        # to be handed back one chunk at a time
+        self._batch_in = np.empty(NOISE_BATCH_SAMPLES + buffer_size, dtype=np.float32)
+        self._batch_in_len = 0
+        self._batch_out = np.zeros(2 * (NOISE_BATCH_SAMPLES + buffer_size), dtype=np.float32)
+        self._batch_out_len = 0
+        
+        # Worker threads for feature extraction, so pyin/HPSS do not block the
+        # caller; NumPy/SciPy and the nogil Numba kernels release the GIL
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="audio-features")
         
-        logger.info(f"Audio processor initialized (normalize={normalize}, noise_reduction={noise_reduction})")
+        logger.info("Audio processor initialized (normalize=%s, noise_reduction=%s)", normalize, noise_reduction)
     
-    def process(self, audio_data):
+    def process(self, audio_data, out=None):
         """
         Process audio data
         
+        Unless out is given, the result may be the input itself or a view into
+        an internal buffer that is reused by the next call, so copy it if it
+        needs to be kept.
+        
         Args:
-            audio_data (numpy.ndarray): Raw audio data (int16)
+            audio_data (numpy.ndarray): Raw audio data (int16), or float32 samples in [-1, 1]
+            out (numpy.ndarray, optional): float32 buffer to write the result into.
+                Defaults to None (use an internal buffer).
             
         Returns:
             numpy.ndarray: Processed audio data (float32 normalized to [-1, 1])
         """
-        # Convert to float32
-        audio_float = audio_data.astype(np.float32) / 32768.0  # Normalize to [-1, 1]
+        reduce_noise = self.noise_reduction and self._noise_active
+        is_float = audio_data.dtype == np.float32
+        
+        # Audio pending in the noise reduction batch belongs to the stream before
+        # this chunk; drop it when this chunk is not batched, so it is not played
+        # out of place once batching resumes
+        if not reduce_noise or len(audio_data) >= NOISE_BATCH_SAMPLES:
+            self._batch_in_len = 0
+            self._batch_out_len = 0
+        
+        # Nothing to do for float32 input when all preprocessing is disabled
+        if is_float and out is None and not self.normalize and not reduce_noise:
+            return audio_data
+        
+        if out is None:
+            self._ensure_capacity(len(audio_data))
+            out = self._f32_buf[:len(audio_data)]
+        
+        # Convert to float32 in a single pass into the output buffer
+        if is_float:
+            np.copyto(out, audio_data)
+        else:
+            np.multiply(audio_data, INT16_TO_FLOAT, out=out)
+        audio_float = out
         
         # Apply preprocessing
         if self.normalize:
             audio_float = self._normalize_audio(audio_float)
         
-        if self.noise_reduction and self.noise_profile is not None:
-            audio_float = self._reduce_noise(audio_float)
+        if reduce_noise:
+            if len(audio_float) < NOISE_BATCH_SAMPLES:
+                self._reduce_noise_batched(audio_float)
+            else:
+                np.copyto(audio_float, self._reduce_noise(audio_float))
         
         return audio_float
     
@@ -59,43 +150,89 @@ class AudioProcessor:
         """
         Post-process audio data after transformation
         
+        The result is a view into an internal buffer that is reused by the next
+        call, so copy it if it needs to be kept.
+        
         Args:
             audio_data (numpy.ndarray): Transformed audio data (float32 in [-1, 1])
             
         Returns:
             numpy.ndarray: Processed audio data (int16)
         """
-        # Ensure audio is within [-1, 1] range
-        audio_data = np.clip(audio_data, -1.0, 1.0)
+        n = len(audio_data)
+        self._ensure_capacity(n)
+        audio_int = self._i16_buf[:n]
+        
+        if kernels.HAVE_NUMBA:
+            # Clip, scale and cast in one pass
+            kernels.float_to_int16_saturate(np.ascontiguousarray(audio_data, dtype=np.float32), audio_int)
+            return audio_int
+        
+        scratch = self._clip_buf[:n]
+        
+        # Ensure audio is within [-1, 1] range and scale, without temporaries
+        np.clip(audio_data, -1.0, 1.0, out=scratch)
+        np.multiply(scratch, FLOAT_TO_INT16, out=scratch)
         
         # Convert back to int16
-        audio_int = (audio_data * 32767).astype(np.int16)
+        np.copyto(audio_int, scratch, casting='unsafe')
         
         return audio_int
     
+    def _ensure_capacity(self, n):
+        """
+        Grow the conversion buffers if a chunk is larger than they are
+        
+        Args:
+            n (int): Number of samples required
+        """
+        if n > len(self._f32_buf):
+            self._f32_buf = np.empty(n, dtype=np.float32)
+            self._clip_buf = np.empty(n, dtype=np.float32)
+            self._i16_buf = np.empty(n, dtype=np.int16)
+    
     def _normalize_audio(self, audio_data):
         """
-        Normalize audio volume
+        Normalize audio volume in place
         
         Args:
-            audio_data (numpy.ndarray): Audio data
+            audio_data (numpy.ndarray): Audio data (float32), modified in place
             
         Returns:
             numpy.ndarray: Normalized audio data
         """
-        # Get maximum amplitude
-        max_amp = np.max(np.abs(audio_data))
+        if kernels.HAVE_NUMBA and audio_data.flags.c_contiguous:
+            # Peak search and scaling fused into one kernel
+            kernels.normalize_inplace(audio_data, NORMALIZE_TARGET, NORMALIZE_FLOOR)
+            return audio_data
+        
+        # Get maximum amplitude without materializing |x|
+        if len(audio_data) == 0:
+            return audio_data
+        max_amp = max(audio_data.max(), -audio_data.min())
         
         # Only normalize if the maximum amplitude is not too small
-        if max_amp > 0.01:
+        if max_amp > NORMALIZE_FLOOR:
             # Normalize to 70% of maximum possible amplitude
-            target_amp = 0.7
-            gain = target_amp / max_amp
-            normalized_audio = audio_data * gain
-            return normalized_audio
-        else:
-            # Audio is very quiet, possibly silence
-            return audio_data
+            gain = NORMALIZE_TARGET / max_amp
+            np.multiply(audio_data, gain, out=audio_data)
+        
+        # Otherwise audio is very quiet, possibly silence
+        return audio_data
+    
+    def _stft(self, audio_data):
+        """
+        Compute a single-precision STFT with the cached window
+        
+        Args:
+            audio_data (numpy.ndarray): Audio data (float32)
+            
+        Returns:
+            numpy.ndarray: Complex64 STFT matrix (freq x frames)
+        """
+        audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+        return librosa.stft(audio_data, n_fft=self.n_fft, hop_length=self.hop_length,
+                            window=self._window, dtype=np.complex64)
     
     def update_noise_profile(self, audio_data):
         """
@@ -107,10 +244,21 @@ class AudioProcessor:
         if np.max(np.abs(audio_data)) < self.noise_threshold:
             # Convert to float if not already
             if audio_data.dtype != np.float32:
-                audio_data = audio_data.astype(np.float32) / 32768.0
+                audio_data = np.multiply(audio_data, INT16_TO_FLOAT, dtype=np.float32)
             
-            # Compute noise profile (spectral characteristics)
-            self.noise_profile = np.mean(np.abs(librosa.stft(audio_data)), axis=1)
+            # Compute noise profile (spectral characteristics) as the RMS STFT
+            # magnitude per bin. Welch's method averages windowed periodograms in
+            # one call, without building and storing a full complex STFT.
+            nperseg = min(len(audio_data), self.n_fft)
+            _, psd = signal.welch(audio_data, window='hann', nperseg=nperseg, nfft=self.n_fft,
+                                  detrend=False, scaling='spectrum')
+            # Undo Welch's window normalization and one-sided doubling so the
+            # profile is in the same units as |STFT|
+            window_sum = signal.get_window('hann', nperseg).sum()
+            psd[1:-1] /= 2.0
+            self.noise_profile = (np.sqrt(psd) * window_sum).astype(np.float32)
+            self._noise_floor = (self.noise_profile * self.noise_gate).astype(np.float32)
+            self._noise_active = bool(self._noise_floor.max() > NOISE_ACTIVE_FLOOR)
             logger.info("Noise profile updated")
     
     def _reduce_noise(self, audio_data):
@@ -123,21 +271,98 @@ class AudioProcessor:
         Returns:
             numpy.ndarray: Noise-reduced audio data
         """
+        # Skip the STFT round trip when subtraction would change nothing audible
+        if not self._noise_active or len(audio_data) == 0:
+            return audio_data
+        if np.sqrt(np.dot(audio_data, audio_data) / len(audio_data)) < NOISE_ACTIVE_FLOOR:
+            return audio_data
+        
         # Simple spectral subtraction
-        stft = librosa.stft(audio_data)
-        stft_mag = np.abs(stft)
-        stft_phase = np.angle(stft)
+        stft = self._stft(audio_data)
         
-        # Subtract noise profile with a noise gate
-        noise_gate = 2.0
-        stft_mag_reduced = np.maximum(stft_mag - self.noise_profile[:, np.newaxis] * noise_gate, 0)
+        if kernels.HAVE_NUMBA:
+            # Single fused pass over the STFT
+            stft_reduced = np.empty_like(stft)
+            kernels.spectral_subtract(stft, self._noise_floor, stft_reduced)
+        else:
+            stft_mag = np.abs(stft)
+            
+            # Subtract noise profile with a noise gate
+            stft_mag_reduced = np.maximum(stft_mag - self._noise_floor[:, np.newaxis], 0)
+            
+            # Rescale each bin by reduced/original magnitude, which keeps its phase
+            # without computing angle() and exp(1j * phase)
+            stft_reduced = stft * (stft_mag_reduced / (stft_mag + np.float32(1e-12)))
         
-        # Reconstruct signal
-        stft_reduced = stft_mag_reduced * np.exp(1j * stft_phase)
-        audio_reduced = librosa.istft(stft_reduced, length=len(audio_data))
+        audio_reduced = librosa.istft(stft_reduced, hop_length=self.hop_length, n_fft=self.n_fft,
+                                      window=self._window, length=len(audio_data), dtype=np.float32)
         
         return audio_reduced
     
+    def _reduce_noise_batched(self, audio_data):
+        """
+        Apply noise reduction to a small chunk by batching it with its neighbours
+        
+        Chunks are collected until NOISE_BATCH_SAMPLES are buffered and reduced in
+        one STFT. The chunk is overwritten with the same number of reduced samples
+        from earlier batches, so output lags input by up to one batch and is
+        silent until the first batch completes.
+        
+        Args:
+            audio_data (numpy.ndarray): Audio data (float32), overwritten in place
+        """
+        n = len(audio_data)
+        
+        # Grow the batch buffers if chunks are larger than expected
+        if self._batch_in_len + n > len(self._batch_in):
+            grown = np.empty(NOISE_BATCH_SAMPLES + n, dtype=np.float32)
+            grown[:self._batch_in_len] = self._batch_in[:self._batch_in_len]
+            self._batch_in = grown
+        
+        self._batch_in[self._batch_in_len:self._batch_in_len + n] = audio_data
+        self._batch_in_len += n
+        
+        if self._batch_in_len >= NOISE_BATCH_SAMPLES:
+            reduced = self._reduce_noise(self._batch_in[:self._batch_in_len])
+            m = len(reduced)
+            if self._batch_out_len + m > len(self._batch_out):
+                grown = np.zeros(2 * (self._batch_out_len + m), dtype=np.float32)
+                grown[:self._batch_out_len] = self._batch_out[:self._batch_out_len]
+                self._batch_out = grown
+            self._batch_out[self._batch_out_len:self._batch_out_len + m] = reduced
+            self._batch_out_len += m
+            self._batch_in_len = 0
+        
+        if self._batch_out_len < n:
+            # Still filling the first batch
+            audio_data.fill(0.0)
+            return
+        
+        audio_data[:] = self._batch_out[:n]
+        remaining = self._batch_out_len - n
+        self._batch_out[:remaining] = self._batch_out[n:self._batch_out_len]
+        self._batch_out_len = remaining
+    
+    def extract_features_async(self, audio_data):
+        """
+        Extract audio features on a worker thread
+        
+        Args:
+            audio_data (numpy.ndarray): Processed audio data (copied, so internal
+                buffers returned by process() may be passed directly)
+            
+        Returns:
+            concurrent.futures.Future: Future resolving to the extract_features() result
+        """
+        return self._executor.submit(self.extract_features, np.array(audio_data, dtype=np.float32))
+    
+    def close(self):
+        """
+        Shut down the feature extraction workers
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("Audio processor closed")
+    
     def extract_features(self, audio_data):
         """
         Extract audio features for voice transformation
@@ -155,13 +380,13 @@ class AudioProcessor:
         # Extract fundamental frequency (F0)
         f0, voiced_flag, voiced_probs = librosa.pyin(
             audio_data, 
-            fmin=librosa.note_to_hz('C2'),
-            fmax=librosa.note_to_hz('C6'),
+            fmin=self._fmin,
+            fmax=self._fmax,
             sr=self.sample_rate
         )
         
         # Extract spectral envelope
-        spec = np.abs(librosa.stft(audio_data))
+        spec = np.abs(self._stft(audio_data))
         
         # Simple harmonic-percussive source separation
         harmonic, percussive = librosa.decompose.hpss(spec)
@@ -4,7 +4,6 @@ Command handler module for Voice Transformer
 
 import logging
 import threading
-import time
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +33,22 @@ class CommandHandler:
         self.thread = None
         self.stop_event = threading.Event()
         
+        # Command name -> (handler, whether it takes the argument list), bound once
+        self._commands = {
+            "help": (self.display.help, False),
+            "start": (self._start_transformation, False),
+            "stop": (self._stop_transformation, False),
+            "pause": (self._pause_transformation, False),
+            "resume": (self._resume_transformation, False),
+            "devices": (self._list_devices, False),
+            "input": (self._set_input_device, True),
+            "output": (self._set_output_device, True),
+            "pitch": (self._set_pitch_shift, True),
+            "formant": (self._set_formant_shift, True),
+            "metrics": (self._toggle_metrics, False),
+            "status": (self._show_status, False)
+        }
+        
         logger.info("Command handler initialized")
     
     def start_cli(self):
@@ -56,48 +71,20 @@ class CommandHandler:
         args = parts[1:] if len(parts) > 1 else []
         
         try:
-            if cmd == "help":
+            entry = self._commands.get(cmd)
+            if entry is None:
+                self.display.error(f"Unknown command: {cmd}")
                 self.display.help()
+                return
             
-            elif cmd == "start":
-                self._start_transformation()
-            
-            elif cmd == "stop":
-                self._stop_transformation()
-            
-            elif cmd == "pause":
-                self._pause_transformation()
-            
-            elif cmd == "resume":
-                self._resume_transformation()
-            
-            elif cmd == "devices":
-                self._list_devices()
-            
-            elif cmd == "input":
-                self._set_input_device(args)
-            
-            elif cmd == "output":
-                self._set_output_device(args)
-            
-            elif cmd == "pitch":
-                self._set_pitch_shift(args)
-            
-            elif cmd == "formant":
-                self._set_formant_shift(args)
-            
-            elif cmd == "metrics":
-                self._toggle_metrics()
-            
-            elif cmd == "status":
-                self._show_status()
-            
+            handler, takes_args = entry
+            if takes_args:
+                handler(args)
             else:
-                self.display.error(f"Unknown command: {cmd}")
-                self.display.help()
+                handler()
         
         except Exception as e:
-            logger.error(f"Error processing command: {e}")
+            logger.error("Error processing command: %s", e)
             self.display.error(f"Error: {e}")
     
     def _start_transformation(self):
@@ -137,7 +124,7 @@ class CommandHandler:
             self.display.success("Voice transformation started")
         
         except Exception as e:
-            logger.error(f"Error starting voice transformation: {e}")
+            logger.error("Error starting voice transformation: %s", e)
             self.display.error(f"Failed to start voice transformation: {e}")
             self._cleanup()
     
@@ -171,7 +158,7 @@ class CommandHandler:
             self.display.success("Voice transformation stopped")
         
         except Exception as e:
-            logger.error(f"Error stopping voice transformation: {e}")
+            logger.error("Error stopping voice transformation: %s", e)
             self.display.error(f"Error stopping voice transformation: {e}")
     
     def _pause_transformation(self):
@@ -197,7 +184,7 @@ class CommandHandler:
             self.display.success("Voice transformation paused")
         
         except Exception as e:
-            logger.error(f"Error pausing voice transformation: {e}")
+            logger.error("Error pausing voice transformation: %s", e)
             self.display.error(f"Error pausing voice transformation: {e}")
     
     def _resume_transformation(self):
@@ -223,7 +210,7 @@ class CommandHandler:
             self.display.success("Voice transformation resumed")
         
         except Exception as e:
-            logger.error(f"Error resuming voice transformation: {e}")
+            logger.error("Error resuming voice transformation: %s", e)
             self.display.error(f"Error resuming voice transformation: {e}")
     
     def _list_devices(self):
@@ -265,25 +252,20 @@ class CommandHandler:
                 self._stop_transformation()
             
             # Set new device
-            self.audio_input = type(self.audio_input)(
-                device_index=device_id,
-                sample_rate=self.audio_input.sample_rate,
-                buffer_size=self.audio_input.buffer_size,
-                channels=self.audio_input.channels
-            )
+            self.audio_input.set_device(device_id)
             
             # Restart if it was active
             if was_active:
                 self._start_transformation()
             
             device_name = next((device['name'] for device in devices if device['index'] == device_id), "Unknown")
-            logger.info(f"Input device set to {device_id} ({device_name})")
+            logger.info("Input device set to %s (%s)", device_id, device_name)
             self.display.success(f"Input device set to: {device_name}")
         
         except ValueError:
             self.display.error("Device ID must be a number")
         except Exception as e:
-            logger.error(f"Error setting input device: {e}")
+            logger.error("Error setting input device: %s", e)
             self.display.error(f"Error setting input device: {e}")
     
     def _set_output_device(self, args):
@@ -316,25 +298,20 @@ class CommandHandler:
                 self._stop_transformation()
             
             # Set new device
-            self.audio_output = type(self.audio_output)(
-                device_index=device_id,
-                sample_rate=self.audio_output.sample_rate,
-                buffer_size=self.audio_output.buffer_size,
-                channels=self.audio_output.channels
-            )
+            self.audio_output.set_device(device_id)
             
             # Restart if it was active
             if was_active:
                 self._start_transformation()
             
             device_name = next((device['name'] for device in devices if device['index'] == device_id), "Unknown")
-            logger.info(f"Output device set to {device_id} ({device_name})")
+            logger.info("Output device set to %s (%s)", device_id, device_name)
             self.display.success(f"Output device set to: {device_name}")
         
         except ValueError:
             self.display.error("Device ID must be a number")
         except Exception as e:
-            logger.error(f"Error setting output device: {e}")
+            logger.error("Error setting output device: %s", e)
             self.display.error(f"Error setting output device: {e}")
     
     def _set_pitch_shift(self, args):
@@ -359,13 +336,13 @@ class CommandHandler:
             # Update pipeline parameters
             self.pipeline.update_parameters(pitch_shift=pitch_shift)
             
-            logger.info(f"Pitch shift set to {pitch_shift}")
+            logger.info("Pitch shift set to %s", pitch_shift)
             self.display.success(f"Pitch shift set to {pitch_shift} semitones")
         
         except ValueError:
             self.display.error("Pitch shift must be a number")
         except Exception as e:
-            logger.error(f"Error setting pitch shift: {e}")
+            logger.error("Error setting pitch shift: %s", e)
             self.display.error(f"Error setting pitch shift: {e}")
     
     def _set_formant_shift(self, args):
@@ -390,13 +367,13 @@ class CommandHandler:
             # Update pipeline parameters
             self.pipeline.update_parameters(formant_shift=formant_shift)
             
-            logger.info(f"Formant shift set to {formant_shift}")
+            logger.info("Formant shift set to %s", formant_shift)
             self.display.success(f"Formant shift set to {formant_shift}")
         
         except ValueError:
             self.display.error("Formant shift must be a number")
         except Exception as e:
-            logger.error(f"Error setting formant shift: {e}")
+            logger.error("Error setting formant shift: %s", e)
             self.display.error(f"Error setting formant shift: {e}")
     
     def _toggle_metrics(self):
@@ -427,30 +404,31 @@ class CommandHandler:
         logger.info("Processing loop started")
         
         while not self.stop_event.is_set():
-            if self.active and not self.paused:
-                try:
-                    # Get audio from input
-                    audio_data = self.audio_input.get_audio_chunk()
+            if not self.active or self.paused:
+                # Nothing to do until transformation runs; wake early if stopped
+                self.stop_event.wait(0.05)
+                continue
+            
+            try:
+                # Get audio from input (blocks until a chunk arrives)
+                audio_data = self.audio_input.get_audio_chunk()
+                
+                if audio_data is not None:
+                    # Add to pipeline for processing
+                    self.pipeline.add_audio(audio_data)
                     
-                    if audio_data is not None:
-                        # Add to pipeline for processing
-                        self.pipeline.add_audio(audio_data)
-                        
-                        # Get processed audio from pipeline
-                        transformed_audio = self.pipeline.get_transformed_audio()
-                        
-                        if transformed_audio is not None:
-                            # Send to output
-                            self.audio_output.play_audio(transformed_audio)
+                    # Get processed audio from pipeline
+                    transformed_audio = self.pipeline.get_transformed_audio()
                     
-                    # Update metrics
-                    self.display.update_metrics(self.pipeline.get_metrics())
+                    if transformed_audio is not None:
+                        # Send to output
+                        self.audio_output.play_audio(transformed_audio)
                 
-                except Exception as e:
-                    logger.error(f"Error in processing loop: {e}")
+                # Update metrics
+                self.display.update_metrics(self.pipeline.get_metrics())
             
-            # Sleep a bit to prevent CPU overuse
-            time.sleep(0.001)
+            except Exception as e:
+                logger.error("Error in processing loop: %s", e)
         
         logger.info("Processing loop stopped")
     
@@ -485,6 +463,6 @@ class CommandHandler:
             logger.info("Resources cleaned up")
         
         except Exception as e:
-            logger.error(f"Error during cleanup: {e}")
+            logger.error("Error during cleanup: %s", e)
             if hasattr(self, 'display'):
                 self.display.error(f"Error during cleanup: {e}") 
\ No newline at end of file
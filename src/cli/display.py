@@ -4,7 +4,6 @@ CLI display module for Voice Transformer
 
 import os
 import sys
-import time
 import logging
 import threading
 from datetime import datetime
@@ -46,14 +45,60 @@ class Display:
         else:
             self.COLORS = {k: '' for k in ['RESET', 'RED', 'GREEN', 'YELLOW', 'BLUE', 'MAGENTA', 'CYAN', 'WHITE', 'BOLD', 'UNDERLINE']}
         
+        # Static colored text, built once instead of on every command
+        c = self.COLORS
+        self._welcome_text = (
+            f"\n{c['BOLD']}{c['CYAN']}Voice Transformer{c['RESET']}\n"
+            f"{c['BOLD']}Real-time male to female voice transformation{c['RESET']}\n"
+            f"Optimized for Vietnamese language\n\n"
+            f"Type {c['YELLOW']}help{c['RESET']} for a list of commands.\n"
+        )
+        self._help_text = "\n".join([
+            f"\n{c['BOLD']}Available Commands:{c['RESET']}",
+            f"  {c['YELLOW']}start{c['RESET']}         - Start voice transformation",
+            f"  {c['YELLOW']}stop{c['RESET']}          - Stop voice transformation",
+            f"  {c['YELLOW']}pause{c['RESET']}         - Temporarily pause transformation",
+            f"  {c['YELLOW']}resume{c['RESET']}        - Resume after pause",
+            f"  {c['YELLOW']}devices{c['RESET']}       - List available audio devices",
+            f"  {c['YELLOW']}input <id>{c['RESET']}    - Set input device by ID",
+            f"  {c['YELLOW']}output <id>{c['RESET']}   - Set output device by ID",
+            f"  {c['YELLOW']}pitch <value>{c['RESET']} - Set pitch shift (semitones, default: 5.0)",
+            f"  {c['YELLOW']}formant <value>{c['RESET']} - Set formant shift (factor, default: 1.2)",
+            f"  {c['YELLOW']}metrics{c['RESET']}       - Toggle performance metrics display",
+            f"  {c['YELLOW']}status{c['RESET']}        - Show current status",
+            f"  {c['YELLOW']}help{c['RESET']}          - Show this help information",
+            f"  {c['YELLOW']}exit{c['RESET']} or {c['YELLOW']}quit{c['RESET']} - Exit the application\n"
+        ])
+        self._devices_hint = (f"\nUse {c['YELLOW']}input <id>{c['RESET']} or "
+                              f"{c['YELLOW']}output <id>{c['RESET']} to select a device.\n")
+        
+        # Pieces of the metrics line, pre-encoded once so a refresh only formats
+        # the numbers and writes bytes
+        self._status_labels = {
+            True: f"\r{' ' * 80}\rStatus: {c['GREEN']}ACTIVE{c['RESET']} | Latency: ".encode(),
+            False: f"\r{' ' * 80}\rStatus: {c['RED']}STOPPED{c['RESET']} | Latency: ".encode()
+        }
+        self._color_bytes = {name: code.encode() for name, code in c.items()}
+        # Latency colors indexed by how many thresholds (40 ms, 80 ms) are exceeded
+        self._latency_colors = (c['GREEN'].encode(), c['YELLOW'].encode(), c['RED'].encode())
+        
+        # Write the metrics line straight to the stdout file descriptor,
+        # bypassing the text layer; fall back to sys.stdout if it has no fd
+        try:
+            self._stdout_fd = sys.stdout.fileno()
+        except (AttributeError, OSError, ValueError):
+            self._stdout_fd = None
+        
         # Display state
         self.active = False
         self.thread = None
         self.stop_event = threading.Event()
         
-        # Metrics
+        # Metrics. update_metrics() publishes a new dict by swapping the
+        # reference (atomic in CPython) and sets _metrics_ready to wake the
+        # display thread, so neither side takes a lock to access the metrics.
         self.metrics = {}
-        self.metrics_lock = threading.Lock()
+        self._metrics_ready = threading.Event()
         
         logger.info("Display initialized")
     
@@ -61,29 +106,13 @@ class Display:
         """
         Display welcome message
         """
-        print(f"\n{self.COLORS['BOLD']}{self.COLORS['CYAN']}Voice Transformer{self.COLORS['RESET']}")
-        print(f"{self.COLORS['BOLD']}Real-time male to female voice transformation{self.COLORS['RESET']}")
-        print(f"Optimized for Vietnamese language\n")
-        print(f"Type {self.COLORS['YELLOW']}help{self.COLORS['RESET']} for a list of commands.\n")
+        print(self._welcome_text)
     
     def help(self):
         """
         Display help information
         """
-        print(f"\n{self.COLORS['BOLD']}Available Commands:{self.COLORS['RESET']}")
-        print(f"  {self.COLORS['YELLOW']}start{self.COLORS['RESET']}         - Start voice transformation")
-        print(f"  {self.COLORS['YELLOW']}stop{self.COLORS['RESET']}          - Stop voice transformation")
-        print(f"  {self.COLORS['YELLOW']}pause{self.COLORS['RESET']}         - Temporarily pause transformation")
-        print(f"  {self.COLORS['YELLOW']}resume{self.COLORS['RESET']}        - Resume after pause")
-        print(f"  {self.COLORS['YELLOW']}devices{self.COLORS['RESET']}       - List available audio devices")
-        print(f"  {self.COLORS['YELLOW']}input <id>{self.COLORS['RESET']}    - Set input device by ID")
-        print(f"  {self.COLORS['YELLOW']}output <id>{self.COLORS['RESET']}   - Set output device by ID")
-        print(f"  {self.COLORS['YELLOW']}pitch <value>{self.COLORS['RESET']} - Set pitch shift (semitones, default: 5.0)")
-        print(f"  {self.COLORS['YELLOW']}formant <value>{self.COLORS['RESET']} - Set formant shift (factor, default: 1.2)")
-        print(f"  {self.COLORS['YELLOW']}metrics{self.COLORS['RESET']}       - Toggle performance metrics display")
-        print(f"  {self.COLORS['YELLOW']}status{self.COLORS['RESET']}        - Show current status")
-        print(f"  {self.COLORS['YELLOW']}help{self.COLORS['RESET']}          - Show this help information")
-        print(f"  {self.COLORS['YELLOW']}exit{self.COLORS['RESET']} or {self.COLORS['YELLOW']}quit{self.COLORS['RESET']} - Exit the application\n")
+        print(self._help_text)
     
     def start_metrics(self):
         """
@@ -110,8 +139,9 @@ class Display:
         if not self.active:
             return
         
-        # Signal thread to stop
+        # Signal thread to stop, waking it if it is waiting for metrics
         self.stop_event.set()
+        self._metrics_ready.set()
         
         # Wait for thread to terminate
         if self.thread is not None:
@@ -126,49 +156,57 @@ class Display:
         Update performance metrics
         
         Args:
-            metrics (dict): Dictionary of performance metrics
+            metrics (dict): Dictionary of performance metrics, not modified afterwards
         """
-        with self.metrics_lock:
-            self.metrics = metrics
+        self.metrics = metrics
+        # Skip the Event's internal lock when a redraw is already pending
+        if not self._metrics_ready.is_set():
+            self._metrics_ready.set()
     
     def _metrics_loop(self):
         """
         Main loop for metrics display
+        
+        Redraws only when update_metrics() has delivered new metrics, and at
+        most once per refresh interval.
         """
+        interval = self.refresh_rate_ms / 1000.0
+        
         while not self.stop_event.is_set():
-            if self.show_metrics:
-                self._display_metrics()
+            dirty = self._metrics_ready.wait(timeout=interval)
+            self._metrics_ready.clear()
             
-            # Sleep until next refresh
-            time.sleep(self.refresh_rate_ms / 1000.0)
+            if dirty and self.show_metrics and not self.stop_event.is_set():
+                self._display_metrics()
+                # Cap the redraw rate; returns early when stopping
+                self.stop_event.wait(interval)
     
     def _display_metrics(self):
         """
         Display performance metrics
         """
-        with self.metrics_lock:
-            if not self.metrics:
-                return
-            
-            # Clear previous line
-            sys.stdout.write('\r' + ' ' * 80 + '\r')
-            
-            # Display metrics
-            latency = self.metrics.get('current_latency_ms', 0)
-            if latency > 80:
-                latency_color = self.COLORS['RED']
-            elif latency > 40:
-                latency_color = self.COLORS['YELLOW']
-            else:
-                latency_color = self.COLORS['GREEN']
-            
-            status = "ACTIVE" if self.metrics.get('is_active', False) else "STOPPED"
-            status_color = self.COLORS['GREEN'] if status == "ACTIVE" else self.COLORS['RED']
-            
-            sys.stdout.write(f"\rStatus: {status_color}{status}{self.COLORS['RESET']} | ")
-            sys.stdout.write(f"Latency: {latency_color}{latency:.1f}ms{self.COLORS['RESET']} | ")
-            sys.stdout.write(f"Buffers: {self.metrics.get('input_queue_len', 0)}/{self.metrics.get('output_queue_len', 0)}")
-            
+        # Snapshot the reference; update_metrics() replaces, never mutates, the dict
+        m = self.metrics
+        if not m:
+            return
+        
+        # Display metrics
+        latency = m.get('current_latency_ms', 0)
+        latency_color = self._latency_colors[0 if latency <= 40 else 1 if latency <= 80 else 2]
+        
+        # Clear the previous line and draw the new one in a single write
+        line = b"%s%s%.1fms%s | Buffers: %d/%d" % (
+            self._status_labels[bool(m.get('is_active', False))],
+            latency_color, latency, self._color_bytes['RESET'],
+            m.get('input_queue_len', 0), m.get('output_queue_len', 0)
+        )
+        
+        if self._stdout_fd is not None:
+            # Keep ordering with text printed through sys.stdout (no syscall if empty)
+            sys.stdout.flush()
+            os.write(self._stdout_fd, line)
+        else:
+            sys.stdout.write(line.decode())
             sys.stdout.flush()
     
     def show_status(self, audio_input, audio_output, pipeline):
@@ -233,7 +271,7 @@ class Display:
             print(f"  [{self.COLORS['CYAN']}{device['index']}{self.COLORS['RESET']}] {device['name']} "
                   f"({device['channels']} channels, {device['sample_rate']} Hz)")
         
-        print(f"\nUse {self.COLORS['YELLOW']}input <id>{self.COLORS['RESET']} or {self.COLORS['YELLOW']}output <id>{self.COLORS['RESET']} to select a device.\n")
+        print(self._devices_hint)
     
     def error(self, message):
         """
@@ -8,17 +8,25 @@ import logging
 import time
 import threading
 from collections import deque
+from fractions import Fraction
 
+from src.audio import kernels
 from src.transformation.rvc_model import RVCModel
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of chunks held in the input and output queues
+QUEUE_SIZE = 100
+# Default output backlog (in chunks) above which new input is dropped
+HIGH_WATER = 8
+
 class TransformationPipeline:
     """
     Voice transformation pipeline that coordinates the audio processing and transformation
     """
     
-    def __init__(self, model_path, pitch_shift=5.0, formant_shift=1.2, intensity=0.8, preserve_tones=True):
+    def __init__(self, model_path, pitch_shift=5.0, formant_shift=1.2, intensity=0.8, preserve_tones=True,
+                 high_water=HIGH_WATER):
         """
         Initialize the transformation pipeline
         
@@ -28,12 +36,15 @@ class TransformationPipeline:
             formant_shift (float, optional): Formant shift factor. Defaults to 1.2.
             intensity (float, optional): Voice conversion intensity. Defaults to 0.8.
             preserve_tones (bool, optional): Whether to preserve tonal variations. Defaults to True.
+            high_water (int, optional): Output queue length at which input chunks are
+                dropped instead of processed, bounding added latency. Defaults to HIGH_WATER.
         """
         self.model_path = model_path
         self.pitch_shift = pitch_shift
         self.formant_shift = formant_shift
         self.intensity = intensity
         self.preserve_tones = preserve_tones
+        self.high_water = high_water
         
         # Initialize the RVC model
         self.model = RVCModel(model_path)
@@ -43,16 +54,42 @@ class TransformationPipeline:
         self.thread = None
         self.stop_event = threading.Event()
         
-        # Buffers for audio processing
-        self.input_queue = deque(maxlen=100)
-        self.output_queue = deque(maxlen=100)
-        self.lock = threading.Lock()
+        # Buffers for audio processing, holding float32 chunks in [-1, 1];
+        # conversion to and from int16 happens only at the audio device
+        # boundaries (AudioInput/AudioOutput). deque.append() and popleft() are atomic
+        # in CPython, and each queue has one producer and one consumer, so no
+        # lock is needed.
+        self.input_queue = deque(maxlen=QUEUE_SIZE)
+        self.output_queue = deque(maxlen=QUEUE_SIZE)
+        # Set by add_audio() so the processing loop sleeps until there is work
+        self.input_ready = threading.Event()
+        
+        # add_audio() copies chunks into slots of an input ring, sized like the
+        # output ring, since callers may pass views into their own buffers
+        # (AudioInput's ring) that are reused while the chunk is still queued
+        self._in_ring = None
+        self._in_slot = 0
+        
+        # Output chunks of _simulate_transformation are slots of a ring, sized on
+        # the first chunk, with room for a full output queue plus the chunk the
+        # consumer is holding, so a queued chunk is never overwritten before it
+        # is played.
+        self._out_ring = None
+        self._out_slot = 0
+        # Resampling indices and formant sine table, cached per chunk length and
+        # rebuilt when the parameters they depend on change
+        self._indices = None
+        self._indices_key = None
+        self._sin_table = None
+        self._sin_key = None
         
         # Performance metrics
         self.processing_times = deque(maxlen=50)  # Last 50 processing times
+        self._latency_sum = 0.0  # Running sum of processing_times
+        self.dropped_chunks = 0  # Input chunks dropped because output backed up
         self.last_latency = 0
         
-        logger.info(f"Transformation pipeline initialized (pitch_shift={pitch_shift}, formant_shift={formant_shift})")
+        logger.info("Transformation pipeline initialized (pitch_shift=%s, formant_shift=%s)", pitch_shift, formant_shift)
     
     def start(self):
         """
@@ -80,8 +117,9 @@ class TransformationPipeline:
         if not self.active:
             return
         
-        # Signal thread to stop
+        # Signal thread to stop, waking it if it is waiting for input
         self.stop_event.set()
+        self.input_ready.set()
         
         # Wait for thread to terminate
         if self.thread is not None:
@@ -109,23 +147,33 @@ class TransformationPipeline:
         Add audio data to the input queue for processing
         
         Args:
-            audio_data (numpy.ndarray): Audio data to process
+            audio_data (numpy.ndarray): Audio data to process (float32 in [-1, 1]);
+                copied, so the caller may reuse its buffer
         """
-        with self.lock:
-            self.input_queue.append(audio_data)
+        n = len(audio_data)
+        if self._in_ring is None or n > self._in_ring.shape[1]:
+            # Chunks already queued keep referencing the old ring, so it can be replaced
+            self._in_ring = np.empty((QUEUE_SIZE + 2, n), dtype=np.float32)
+            self._in_slot = 0
+        chunk = self._in_ring[self._in_slot, :n]
+        self._in_slot = (self._in_slot + 1) % len(self._in_ring)
+        np.copyto(chunk, audio_data)
+        
+        self.input_queue.append(chunk)
+        self.input_ready.set()
     
     def get_transformed_audio(self):
         """
         Get the next chunk of transformed audio from the output queue
         
         Returns:
-            numpy.ndarray: Transformed audio data, or None if no data is available
+            numpy.ndarray: Transformed audio data (float32 in [-1, 1]), or None if
+                no data is available
         """
-        with self.lock:
-            if len(self.output_queue) > 0:
-                return self.output_queue.popleft()
-            else:
-                return None
+        try:
+            return self.output_queue.popleft()
+        except IndexError:
+            return None
     
     def _processing_loop(self):
         """
@@ -139,54 +187,43 @@ class TransformationPipeline:
         
         while not self.stop_event.is_set():
             # Check if there's audio to process
-            audio_data = None
-            with self.lock:
-                if len(self.input_queue) > 0:
-                    audio_data = self.input_queue.popleft()
+            try:
+                audio_data = self.input_queue.popleft()
+            except IndexError:
+                # Wait for add_audio() instead of polling; re-check after clearing
+                # so a chunk added in between is not missed
+                self.input_ready.clear()
+                if len(self.input_queue) == 0:
+                    self.input_ready.wait(timeout=0.05)
+                continue
             
-            if audio_data is not None:
-                try:
-                    # Measure processing time
-                    start_time = time.time()
-                    
-                    # Process audio (this is a simplified implementation)
-                    # In a real implementation, we would:
-                    # 1. Extract audio features
-                    # 2. Apply voice conversion
-                    # 3. Synthesize transformed audio
-                    
-                    # Since this is a placeholder, we'll simulate the process
-                    # with some dummy operations to show latency measurement
-                    
-                    # Simulate feature extraction (approximately 10-20ms)
-                    time.sleep(0.015)
-                    
-                    # Simulate voice conversion (approximately 20-50ms)
-                    time.sleep(0.035)
-                    
-                    # Simulate audio synthesis (approximately 10-20ms)
-                    time.sleep(0.015)
-                    
-                    # For demo purposes, we'll just add some noise to the original audio
-                    # with a pitch shift effect to simulate transformation
-                    transformed_audio = self._simulate_transformation(audio_data)
-                    
-                    # Add to output queue
-                    with self.lock:
-                        self.output_queue.append(transformed_audio)
-                    
-                    # Record processing time
-                    end_time = time.time()
-                    proc_time = (end_time - start_time) * 1000  # Convert to ms
-                    with self.lock:
-                        self.processing_times.append(proc_time)
-                        self.last_latency = proc_time
-                    
-                except Exception as e:
-                    logger.error(f"Error processing audio: {e}")
+            # Backpressure: stale audio is useless for real-time voice, so when the
+            # consumer falls behind, drop input rather than grow the latency
+            if len(self.output_queue) >= self.high_water:
+                self.dropped_chunks += 1
+                continue
             
-            # Sleep a bit to prevent CPU overuse
-            time.sleep(0.001)
+            try:
+                # Process audio (this is a simplified implementation)
+                # In a real implementation, we would:
+                # 1. Extract audio features
+                # 2. Apply voice conversion
+                # 3. Synthesize transformed audio
+                
+                # For demo purposes, we'll just add some noise to the original audio
+                # with a pitch shift effect to simulate transformation
+                start_time = time.perf_counter()
+                transformed_audio = self._simulate_transformation(audio_data)
+                proc_time = (time.perf_counter() - start_time) * 1000  # Convert to ms
+                
+                # Add to output queue
+                self.output_queue.append(transformed_audio)
+                
+                # Record processing time
+                self._record_latency(proc_time)
+                
+            except Exception as e:
+                logger.error("Error processing audio: %s", e)
         
         logger.info("Processing loop stopped")
     
@@ -195,36 +232,104 @@ class TransformationPipeline:
         Simulate voice transformation for demonstration purposes
         
         Args:
-            audio_data (numpy.ndarray): Input audio data
+            audio_data (numpy.ndarray): Input audio data (float32 in [-1, 1])
             
         Returns:
-            numpy.ndarray: Simulated transformed audio
+            numpy.ndarray: Simulated transformed audio (float32 in [-1, 1])
         """
-        # Convert to float if necessary
-        if audio_data.dtype != np.float32:
-            audio_float = audio_data.astype(np.float32) / 32768.0
-        else:
-            audio_float = audio_data.copy()
+        audio = np.ascontiguousarray(audio_data, dtype=np.float32)
         
         # Simple pitch shift simulation using resampling
         # (Not a realistic pitch shift, just for demonstration)
-        pitch_factor = 2 ** (self.pitch_shift / 12.0)
-        # Stretch audio by pitch factor
-        indices = np.round(np.arange(0, len(audio_float), pitch_factor)).astype(int)
-        indices = indices[indices < len(audio_float)]
+        indices = self._get_indices(len(audio))
+        m = len(indices)
+        self._ensure_out_ring(m)
+        
+        # Output goes into the next output ring slot
+        out = self._out_ring[self._out_slot, :m]
+        self._out_slot = (self._out_slot + 1) % len(self._out_ring)
+        
+        if kernels.HAVE_NUMBA:
+            # Gather, formant shift and clip fused in one pass
+            kernels.resample_transform(audio, indices, self._get_sin_table(m), out)
+            return out
+        
+        np.take(audio, indices, out=out)
         
         # Simple artificial formant shift by adding harmonics
         # (Not a realistic formant shift, just for demonstration)
-        formant_shift = np.sin(np.arange(len(indices)) * 0.1 * self.formant_shift) * 0.1
-        
-        # Create transformed audio
-        transformed = audio_float[indices] + formant_shift
+        np.add(out, self._get_sin_table(m), out=out)
         
         # Normalize
-        transformed = np.clip(transformed, -0.99, 0.99)
+        np.clip(out, -0.99, 0.99, out=out)
+        return out
+    
+    def _ensure_out_ring(self, n):
+        """
+        Allocate the output ring for chunks of up to n output samples
         
-        # Convert back to int16
-        return (transformed * 32767).astype(np.int16)
+        Args:
+            n (int): Number of samples required
+        """
+        if self._out_ring is not None and n <= self._out_ring.shape[1]:
+            return
+        # Chunks already queued keep referencing the old ring, so it can be replaced
+        self._out_ring = np.empty((QUEUE_SIZE + 2, n), dtype=np.float32)
+        self._out_slot = 0
+    
+    def _get_indices(self, n):
+        """
+        Get the resampling indices for the current pitch shift
+        
+        Args:
+            n (int): Input chunk length in samples
+            
+        Returns:
+            numpy.ndarray: Indices into the input chunk
+        """
+        key = (n, self.pitch_shift)
+        if key != self._indices_key:
+            pitch_factor = 2 ** (self.pitch_shift / 12.0)
+            # Stretch audio by pitch factor, using a rational approximation
+            # num/den so the indices are exact integer arithmetic. Rounding the
+            # output length up keeps every index below n without a mask.
+            ratio = Fraction(pitch_factor).limit_denominator(1024)
+            num, den = ratio.numerator, ratio.denominator
+            out_len = -(-n * den // num)
+            self._indices = np.arange(out_len, dtype=np.int64) * num // den
+            self._indices_key = key
+        return self._indices
+    
+    def _get_sin_table(self, m):
+        """
+        Get the formant sine table for the current formant shift
+        
+        Args:
+            m (int): Output chunk length in samples
+            
+        Returns:
+            numpy.ndarray: float32 sine table of m samples
+        """
+        key = (m, self.formant_shift)
+        if key != self._sin_key:
+            self._sin_table = (np.sin(np.arange(m) * 0.1 * self.formant_shift) * 0.1).astype(np.float32)
+            self._sin_key = key
+        return self._sin_table
+    
+    def _record_latency(self, proc_time):
+        """
+        Record a processing time, keeping the running sum in step with the window
+        
+        Args:
+            proc_time (float): Processing time in milliseconds
+        """
+        times = self.processing_times
+        if len(times) == times.maxlen:
+            # The append below evicts the oldest entry
+            self._latency_sum -= times[0]
+        times.append(proc_time)
+        self._latency_sum += proc_time
+        self.last_latency = proc_time
     
     def get_metrics(self):
         """
@@ -233,20 +338,22 @@ class TransformationPipeline:
         Returns:
             dict: Dictionary of performance metrics
         """
-        with self.lock:
-            if len(self.processing_times) > 0:
-                avg_latency = sum(self.processing_times) / len(self.processing_times)
-                max_latency = max(self.processing_times)
-                min_latency = min(self.processing_times)
-                current_latency = self.last_latency
-            else:
-                avg_latency = 0
-                max_latency = 0
-                min_latency = 0
-                current_latency = 0
-            
-            input_queue_len = len(self.input_queue)
-            output_queue_len = len(self.output_queue)
+        times = self.processing_times
+        count = len(times)
+        if count > 0:
+            # Average from the running sum; max/min scan the small window in C
+            avg_latency = self._latency_sum / count
+            max_latency = max(times)
+            min_latency = min(times)
+            current_latency = self.last_latency
+        else:
+            avg_latency = 0
+            max_latency = 0
+            min_latency = 0
+            current_latency = 0
+        
+        input_queue_len = len(self.input_queue)
+        output_queue_len = len(self.output_queue)
         
         return {
             'avg_latency_ms': avg_latency,
@@ -255,6 +362,7 @@ class TransformationPipeline:
             'current_latency_ms': current_latency,
             'input_queue_len': input_queue_len,
             'output_queue_len': output_queue_len,
+            'dropped_chunks': self.dropped_chunks,
             'is_active': self.active
         }
     
@@ -280,8 +388,8 @@ class TransformationPipeline:
         if preserve_tones is not None:
             self.preserve_tones = preserve_tones
         
-        logger.info(f"Parameters updated: pitch_shift={self.pitch_shift}, formant_shift={self.formant_shift}, "
-                  f"intensity={self.intensity}, preserve_tones={self.preserve_tones}")
+        logger.info("Parameters updated: pitch_shift=%s, formant_shift=%s, intensity=%s, preserve_tones=%s",
+                    self.pitch_shift, self.formant_shift, self.intensity, self.preserve_tones)
     
     def is_active(self):
         """
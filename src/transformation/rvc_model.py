@@ -11,6 +11,10 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of cached formant shift matrices; the cache is cleared when
+# it is full, since only a handful of (size, shift) pairs are used at a time
+FORMANT_CACHE_SIZE = 8
+
 class RVCModel:
     """
     Wrapper for the RVC model for voice conversion
@@ -35,7 +39,23 @@ class RVCModel:
         self.model = None
         self.is_loaded = False
         
-        logger.info(f"RVC model initialized (device={self.device})")
+        # Half precision on CUDA (tensor cores, half the memory traffic); the
+        # placeholder model is not sensitive to the lost precision
+        self._use_fp16 = self.device == 'cuda'
+        self._compute_dtype = torch.float16 if self._use_fp16 else torch.float32
+        
+        # Frequency multiplier for the current pitch shift, cached by set_pitch_shift()
+        self._pitch_shift = None
+        self._pitch_mul = 1.0
+        
+        # Formant shift matrices on self.device, keyed by (bins, formant_shift)
+        self._formant_cache = {}
+        
+        # Pinned host staging buffers for host-to-device copies, keyed by name
+        # and grown on demand (unused on CPU)
+        self._staging = {}
+        
+        logger.info("RVC model initialized (device=%s)", self.device)
     
     def load(self):
         """
@@ -50,13 +70,13 @@ class RVCModel:
         try:
             # Check if model file exists
             if not os.path.exists(self.model_path):
-                logger.error(f"Model file not found: {self.model_path}")
+                logger.error("Model file not found: %s", self.model_path)
                 return False
             
             # TODO: Replace this with actual RVC model loading code
             # This is a placeholder implementation that simulates loading
             # In a real implementation, we would load the model weights here
-            logger.info(f"Loading RVC model from {self.model_path}")
+            logger.info("Loading RVC model from %s", self.model_path)
             
             # Simulate model loading (time delay)
             time.sleep(1)
@@ -72,12 +92,32 @@ class RVCModel:
                 ).to(self.device)
             }
             
+            if self.device == 'cpu':
+                # Dynamic int8 quantization of the Linear layers: weights are
+                # quantized once, activations per call, so no calibration is needed
+                self.model['main_model'] = torch.ao.quantization.quantize_dynamic(
+                    self.model['main_model'].eval(), {torch.nn.Linear}, dtype=torch.qint8
+                )
+            
+            # Compile the conversion network to TorchScript to cut Python
+            # dispatch overhead per chunk; inference only, so eval mode
+            self.model['main_model'] = torch.jit.script(self.model['main_model'].eval())
+            
+            if self._use_fp16:
+                self.model['main_model'] = self.model['main_model'].half()
+            
+            if self.device == 'cuda':
+                # Input shapes repeat chunk to chunk, so autotuning pays off;
+                # TF32 matmuls are accurate enough for spectral envelopes
+                torch.backends.cudnn.benchmark = True
+                torch.set_float32_matmul_precision('high')
+            
             self.is_loaded = True
             logger.info("RVC model loaded successfully")
             return True
             
         except Exception as e:
-            logger.error(f"Error loading RVC model: {e}")
+            logger.error("Error loading RVC model: %s", e)
             return False
     
     def unload(self):
@@ -87,10 +127,27 @@ class RVCModel:
         if self.is_loaded:
             # Free model resources
             self.model = None
-            torch.cuda.empty_cache()
+            self._formant_cache.clear()
+            self._staging.clear()
+            # Only a CUDA device has a cache to release; skip the driver sync otherwise
+            if self.device == 'cuda' and torch.cuda.is_available():
+                torch.cuda.empty_cache()
             self.is_loaded = False
             logger.info("RVC model unloaded")
     
+    def set_pitch_shift(self, pitch_shift):
+        """
+        Precompute the frequency multiplier for a pitch shift
+        
+        convert() calls this itself when it sees a new pitch shift, so calling
+        it ahead of time just moves the work off the first converted chunk.
+        
+        Args:
+            pitch_shift (float): Pitch shift in semitones
+        """
+        self._pitch_shift = pitch_shift
+        self._pitch_mul = 2.0 ** (pitch_shift / 12.0)
+    
     def convert(self, features, pitch_shift=5.0, formant_shift=1.2, intensity=0.8, preserve_tones=True):
         """
         Perform voice conversion on audio features
@@ -118,40 +175,30 @@ class RVCModel:
             harmonic = features['harmonic_components']
             aperiodic = features['aperiodic_components']
             
-            # Process on device
-            f0_torch = torch.tensor(f0[voiced_flag], dtype=torch.float32).to(self.device)
-            spec_torch = torch.tensor(spec.T, dtype=torch.float32).to(self.device)
-            
-            # Pitch shift (in a real implementation, this would be more complex)
-            # For Vietnamese, we need to be careful with tonal preservation
-            if preserve_tones:
-                # Preserve relative pitch variations (important for tonal languages)
-                # Get the mean pitch for normalization
-                if len(f0_torch) > 0:
-                    mean_f0 = torch.mean(f0_torch)
-                    # Shift pitch while preserving variations
-                    shifted_f0 = f0_torch * (2 ** (pitch_shift / 12.0))
-                    # Preserve original tone contour
-                    shifted_f0 = shifted_f0 - torch.mean(shifted_f0) + mean_f0 * (2 ** (pitch_shift / 12.0))
-                else:
-                    shifted_f0 = f0_torch
-            else:
-                # Simple pitch shift
-                shifted_f0 = f0_torch * (2 ** (pitch_shift / 12.0))
-            
-            # Apply voice conversion (placeholder implementation)
-            # In a real implementation, this would use the RVC model
-            converted_spec = self.model['main_model'](spec_torch) * intensity + spec_torch * (1 - intensity)
-            
-            # Apply formant shifting (simplified implementation)
-            # In a real implementation, this would involve more sophisticated spectral manipulation
-            freq_axis = torch.linspace(0, 1, spec.shape[0]).to(self.device)
-            formant_shift_matrix = torch.exp(-(freq_axis.unsqueeze(1) - freq_axis.unsqueeze(0) / formant_shift) ** 2 / 0.1).to(self.device)
-            formant_shifted_spec = torch.matmul(formant_shift_matrix, converted_spec)
-            
-            # Normalize energy to match original
-            energy_factor = torch.sum(torch.abs(spec_torch)) / torch.sum(torch.abs(formant_shifted_spec))
-            formant_shifted_spec = formant_shifted_spec * energy_factor
+            with torch.inference_mode():
+                # Process on device
+                f0_torch = self._to_device(f0[voiced_flag], 'f0')
+                spec_torch = self._to_device(spec.T, 'spec')
+                
+                shifted_f0 = self._shift_f0(f0_torch, pitch_shift, preserve_tones)
+                
+                with torch.autocast(device_type='cuda', dtype=torch.float16, enabled=self._use_fp16):
+                    # Apply voice conversion (placeholder implementation)
+                    # In a real implementation, this would use the RVC model
+                    model_out = self.model['main_model'](spec_torch.to(self._compute_dtype))
+                    converted_spec = model_out * intensity + spec_torch * (1 - intensity)
+                    
+                    # Apply formant shifting (simplified implementation)
+                    # In a real implementation, this would involve more sophisticated spectral manipulation
+                    formant_shift_matrix = self._get_formant_matrix(spec.shape[0], formant_shift)
+                    formant_shifted_spec = torch.matmul(formant_shift_matrix, converted_spec)
+                
+                # Back to float32 for the energy sums and the numpy output
+                formant_shifted_spec = formant_shifted_spec.float()
+                
+                # Normalize energy to match original
+                energy_factor = torch.sum(torch.abs(spec_torch)) / torch.sum(torch.abs(formant_shifted_spec))
+                formant_shifted_spec = formant_shifted_spec * energy_factor
             
             # Create output features
             transformed_features = dict(features)
@@ -167,9 +214,95 @@ class RVCModel:
             return transformed_features
             
         except Exception as e:
-            logger.error(f"Error in voice conversion: {e}")
+            logger.error("Error in voice conversion: %s", e)
             return features
     
+    def _shift_f0(self, f0_torch, pitch_shift, preserve_tones):
+        """
+        Shift the voiced F0 values by the given number of semitones
+        
+        Args:
+            f0_torch (torch.Tensor): Voiced F0 values
+            pitch_shift (float): Pitch shift in semitones
+            preserve_tones (bool): Whether to preserve tonal variations
+            
+        Returns:
+            torch.Tensor: Shifted F0 values
+        """
+        if pitch_shift != self._pitch_shift:
+            self.set_pitch_shift(pitch_shift)
+        pitch_mul = self._pitch_mul
+        
+        # Pitch shift (in a real implementation, this would be more complex)
+        # For Vietnamese, we need to be careful with tonal preservation
+        if preserve_tones:
+            # Preserve relative pitch variations (important for tonal languages)
+            # Get the mean pitch for normalization
+            if len(f0_torch) > 0:
+                mean_f0 = torch.mean(f0_torch)
+                # Shift pitch while preserving variations
+                shifted_f0 = f0_torch * pitch_mul
+                # Preserve original tone contour
+                shifted_f0 = shifted_f0 - torch.mean(shifted_f0) + mean_f0 * pitch_mul
+            else:
+                shifted_f0 = f0_torch
+        else:
+            # Simple pitch shift
+            shifted_f0 = f0_torch * pitch_mul
+        return shifted_f0
+    
+    def _to_device(self, array, name):
+        """
+        Move a numpy array to the device as a float32 tensor
+        
+        On CPU the tensor shares memory with the array (copied only if it is
+        not float32). On CUDA it is staged through a reusable pinned buffer so
+        the transfer can use DMA.
+        
+        Args:
+            array (numpy.ndarray): Array to move
+            name (str): Name of the staging buffer to use
+            
+        Returns:
+            torch.Tensor: float32 tensor on self.device
+        """
+        host = torch.from_numpy(np.asarray(array, dtype=np.float32))
+        if self.device == 'cpu':
+            return host
+        
+        staging = self._staging.get(name)
+        if staging is None or staging.numel() < host.numel():
+            staging = torch.empty(host.numel(), dtype=torch.float32, pin_memory=True)
+            self._staging[name] = staging
+        pinned = staging[:host.numel()].view(host.shape)
+        pinned.copy_(host)
+        # convert() synchronizes when it copies results back, so the staging
+        # buffer is not reused while this transfer is in flight
+        return pinned.to(self.device, non_blocking=True)
+    
+    def _get_formant_matrix(self, n_bins, formant_shift):
+        """
+        Get the formant shift matrix, building it on the device on first use
+        
+        Args:
+            n_bins (int): Number of frequency bins
+            formant_shift (float): Formant shift factor
+            
+        Returns:
+            torch.Tensor: n_bins x n_bins formant shift matrix on self.device
+        """
+        key = (n_bins, round(formant_shift, 4))
+        matrix = self._formant_cache.get(key)
+        if matrix is None:
+            if len(self._formant_cache) >= FORMANT_CACHE_SIZE:
+                self._formant_cache.clear()
+            freq_axis = torch.linspace(0, 1, n_bins, device=self.device)
+            matrix = torch.exp(-(freq_axis.unsqueeze(1) - freq_axis.unsqueeze(0) / formant_shift) ** 2 / 0.1)
+            # Stored in the compute dtype so autocast does not recast it per call
+            matrix = matrix.to(self._compute_dtype)
+            self._formant_cache[key] = matrix
+        return matrix
+    
     def synthesize(self, transformed_features):
         """
         Synthesize audio from transformed features
@@ -198,6 +331,6 @@ class RVCModel:
             return audio
             
         except Exception as e:
-            logger.error(f"Error in audio synthesis: {e}")
+            logger.error("Error in audio synthesis: %s", e)
             # Return empty audio
             return np.zeros(1024) 
\ No newline at end of file
@@ -3,16 +3,87 @@ Configuration utilities for Voice Transformer
 """
 
 import os
+import copy
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Number of distinct (path, mtime, size) versions of config files kept parsed
+CONFIG_CACHE_SIZE = 16
+
+# Default configuration, built once at import and read-only; sections hold only
+# immutable values, so a one-level copy in create_default_config() is enough
+DEFAULT_CONFIG = MappingProxyType({
+    "audio": MappingProxyType({
+        "input_device": None,
+        "output_device": None,
+        "sample_rate": 16000,
+        "buffer_size": 1024,
+        "channels": 1,
+        "format": "int16"
+    }),
+    "transformation": MappingProxyType({
+        "model_path": "models/vietnamese_female.pt",
+        "pitch_shift": 5.0,
+        "formant_shift": 1.2,
+        "intensity": 0.8,
+        "preserve_tones": True
+    }),
+    "performance": MappingProxyType({
+        "threads": 2,
+        "max_latency_ms": 100,
+        "auto_adjust_buffer": True,
+        "enable_gpu": False
+    }),
+    "logging": MappingProxyType({
+        "level": "INFO",
+        "file": "logs/voice_transformer.log",
+        "max_file_size_mb": 10,
+        "backup_count": 3
+    }),
+    "ui": MappingProxyType({
+        "refresh_rate_ms": 250,
+        "show_metrics": True,
+        "color_output": True
+    })
+})
+
+@lru_cache(maxsize=CONFIG_CACHE_SIZE)
+def _load_cached(abs_path, mtime_ns, size):
+    """
+    Parse a configuration file, memoized on its path, mtime and size
+    
+    The modification time and size are part of the cache key, so a file
+    that changes on disk is parsed again. The result is shared between
+    calls and must not be modified; load_config() hands out deep copies.
+    
+    Args:
+        abs_path (str): Absolute path to configuration file
+        mtime_ns (int): Modification time of the file in nanoseconds
+        size (int): Size of the file in bytes
+        
+    Returns:
+        dict: Parsed configuration dictionary
+    """
+    # Whole file in one read, parsed from bytes without a text decoding layer
+    data = Path(abs_path).read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 def load_config(config_path):
     """
     Load configuration from JSON file
     
+    Repeated loads of an unchanged file reuse the parsed result.
+    
     Args:
         config_path (str): Path to configuration file
         
@@ -20,59 +91,81 @@ def load_config(config_path):
         dict: Configuration dictionary
     """
     try:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        logger.info(f"Configuration loaded from {config_path}")
+        abs_path = os.path.abspath(config_path)
+        st = os.stat(abs_path)
+        config = copy.deepcopy(_load_cached(abs_path, st.st_mtime_ns, st.st_size))
+        logger.info("Configuration loaded from %s", config_path)
         return config
     except FileNotFoundError:
-        logger.warning(f"Configuration file {config_path} not found, using default configuration")
+        logger.warning("Configuration file %s not found, using default configuration", config_path)
         return create_default_config()
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing configuration file: {e}")
+    except (json.JSONDecodeError, ValueError) as e:
+        # orjson.JSONDecodeError is a ValueError subclass
+        logger.error("Error parsing configuration file: %s", e)
         logger.warning("Using default configuration")
         return create_default_config()
 
+class ConfigWatcher:
+    """
+    Watch a configuration file and parse it again only when it changes
+    
+    Each get() costs a single stat call while the file is unchanged; the file
+    is only read and parsed when its modification time or size differs from
+    the version last seen.
+    """
+    
+    def __init__(self, config_path):
+        """
+        Initialize the config watcher
+        
+        Args:
+            config_path (str): Path to configuration file
+        """
+        self.path = os.path.abspath(config_path)
+        self._mtime_ns = None
+        self._size = None
+        self._config = None
+    
+    def get(self):
+        """
+        Get the current contents of the configuration file
+        
+        The result is shared between calls and must not be modified. A new
+        object is returned only after the file has changed, so callers can
+        detect a reload with an identity check.
+        
+        Returns:
+            dict: Parsed configuration, or the last good version if the file is
+                missing or does not parse (None if it never did)
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return self._config
+        
+        if st.st_mtime_ns == self._mtime_ns and st.st_size == self._size:
+            return self._config
+        
+        try:
+            self._config = _load_cached(self.path, st.st_mtime_ns, st.st_size)
+            logger.info("Configuration reloaded from %s", self.path)
+        except (OSError, json.JSONDecodeError, ValueError) as e:
+            logger.error("Error reloading configuration file: %s", e)
+        
+        # Remember this version even if it failed to parse, so a broken file
+        # is not read again until it changes
+        self._mtime_ns = st.st_mtime_ns
+        self._size = st.st_size
+        return self._config
+
 def create_default_config():
     """
     Create default configuration
     
     Returns:
-        dict: Default configuration dictionary
+        dict: Default configuration dictionary (a mutable copy of DEFAULT_CONFIG)
     """
-    return {
-        "audio": {
-            "input_device": None,
-            "output_device": None,
-            "sample_rate": 16000,
-            "buffer_size": 512,
-            "channels": 1,
-            "format": "int16"
-        },
-        "transformation": {
-            "model_path": "models/vietnamese_female.pt",
-            "pitch_shift": 5.0,
-            "formant_shift": 1.2,
-            "intensity": 0.8,
-            "preserve_tones": True
-        },
-        "performance": {
-            "threads": 2,
-            "max_latency_ms": 100,
-            "auto_adjust_buffer": True,
-            "enable_gpu": False
-        },
-        "logging": {
-            "level": "INFO",
-            "file": "logs/voice_transformer.log",
-            "max_file_size_mb": 10,
-            "backup_count": 3
-        },
-        "ui": {
-            "refresh_rate_ms": 250,
-            "show_metrics": True,
-            "color_output": True
-        }
-    }
+    return {section: dict(values) for section, values in DEFAULT_CONFIG.items()}
 
 def save_config(config, config_path):
     """
@@ -82,14 +175,28 @@ def save_config(config, config_path):
         config (dict): Configuration dictionary
         config_path (str): Path to save configuration file
     """
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(os.path.abspath(config_path)), exist_ok=True)
-    
     try:
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-        logger.info(f"Configuration saved to {config_path}")
+        # Ensure directory exists
+        Path(config_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        if orjson is not None:
+            data = orjson.dumps(config, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(config, indent=2).encode()
+        
+        # Skip the write if the file already holds exactly this configuration
+        try:
+            unchanged = Path(config_path).read_bytes() == data
+        except OSError:
+            unchanged = False
+        if unchanged:
+            logger.info("Configuration at %s is unchanged", config_path)
+            return True
+        
+        with open(config_path, 'wb') as f:
+            f.write(data)
+        logger.info("Configuration saved to %s", config_path)
         return True
     except Exception as e:
-        logger.error(f"Error saving configuration: {e}")
+        logger.error("Error saving configuration: %s", e)
         return False 
\ No newline at end of file
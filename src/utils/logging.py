@@ -3,9 +3,165 @@ Logging utilities for Voice Transformer
 """
 
 import os
+import queue
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
+import time
+from pathlib import Path
+
+# Listener thread writing queued records to the console and log file
+_listener = None
+
+# Log file write buffer, and how many records or seconds may sit in it unflushed
+LOG_BUFFER_SIZE = 64 * 1024
+LOG_FLUSH_RECORDS = 64
+LOG_FLUSH_INTERVAL = 1.0
+
+class CheapRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that avoids per-record system calls
+    
+    The stdlib handler (before Python 3.12) checks that the log path is a
+    regular file with two stat calls on every record, and flushes after every
+    record. This version tracks the file position itself and only checks the
+    file type once the size limit is reached, as RotatingFileHandler does from
+    Python 3.12. It writes through a LOG_BUFFER_SIZE buffer that is flushed every
+    LOG_FLUSH_RECORDS records, after LOG_FLUSH_INTERVAL seconds, for ERROR and
+    above, and on close. FlushingQueueListener calls flush_pending() when
+    logging goes quiet, so buffered records do not wait for the next one.
+    """
+    
+    def _open(self):
+        """
+        Open the log file with a large write buffer
+        
+        Returns:
+            io.TextIOWrapper: The opened stream
+        """
+        stream = open(self.baseFilename, self.mode, buffering=LOG_BUFFER_SIZE,
+                      encoding=self.encoding, errors=self.errors)
+        # Position is tracked from here on, since tell() would flush the buffer
+        self._pos = stream.tell()
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        return stream
+    
+    def shouldRollover(self, record):
+        """
+        Determine if rollover should occur
+        
+        Args:
+            record (logging.LogRecord): Record about to be emitted
+            
+        Returns:
+            bool: True if the log file should be rolled over first
+        """
+        if self.stream is None:
+            self.stream = self._open()
+        return self._rollover_due(self._byte_len(self.format(record) + self.terminator))
+    
+    def _byte_len(self, msg):
+        """
+        Get the number of bytes msg takes up in the log file
+        
+        Args:
+            msg (str): Text about to be written
+            
+        Returns:
+            int: Encoded length, including newline translation (CRLF on Windows)
+        """
+        n = len(msg) if msg.isascii() else len(msg.encode(self.stream.encoding, self.errors or 'strict'))
+        return n + msg.count('\n') * (len(os.linesep) - 1)
+    
+    def _rollover_due(self, msg_len):
+        """
+        Check whether writing msg_len more characters would exceed maxBytes
+        
+        Args:
+            msg_len (int): Length of the message about to be written
+            
+        Returns:
+            bool: True if the log file should be rolled over first
+        """
+        if self.maxBytes <= 0 or not self._pos:
+            # No size limit, or never roll over an empty file
+            return False
+        if self._pos + msg_len < self.maxBytes:
+            return False
+        # Never roll over anything other than regular files
+        return not (os.path.exists(self.baseFilename) and not os.path.isfile(self.baseFilename))
+    
+    def emit(self, record):
+        """
+        Write a record, rolling the file over first if it is full
+        
+        Args:
+            record (logging.LogRecord): Record to write
+        """
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            msg_len = self._byte_len(msg)
+            if self._rollover_due(msg_len):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._pos += msg_len
+            self._unflushed += 1
+            
+            if (record.levelno >= logging.ERROR or self._unflushed >= LOG_FLUSH_RECORDS
+                    or time.monotonic() - self._last_flush >= LOG_FLUSH_INTERVAL):
+                self.flush()
+                self._unflushed = 0
+                self._last_flush = time.monotonic()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+    
+    def flush_pending(self):
+        """
+        Flush records still sitting in the write buffer, if any
+        """
+        with self.lock:
+            if self.stream is None or not self._unflushed:
+                return
+            self.flush()
+            self._unflushed = 0
+            self._last_flush = time.monotonic()
+
+class FlushingQueueListener(QueueListener):
+    """
+    QueueListener that flushes buffered handlers while the queue is idle
+    
+    Waits for records at most LOG_FLUSH_INTERVAL at a time; whenever the wait
+    times out, handlers with a flush_pending() method write out what they hold.
+    """
+    
+    def dequeue(self, block):
+        """
+        Dequeue a record, flushing handlers each time the queue stays empty for
+        LOG_FLUSH_INTERVAL
+        
+        Args:
+            block (bool): Whether to wait for a record
+            
+        Returns:
+            logging.LogRecord: Next record, or the stop sentinel
+        """
+        while True:
+            try:
+                return self.queue.get(block, LOG_FLUSH_INTERVAL)
+            except queue.Empty:
+                if not block:
+                    raise
+            for handler in self.handlers:
+                flush_pending = getattr(handler, 'flush_pending', None)
+                if flush_pending is not None:
+                    flush_pending()
 
 def setup_logging(config):
     """
@@ -17,15 +173,20 @@ def setup_logging(config):
     Returns:
         logging.Logger: Configured logger
     """
+    # Resolve the log path and size limit once; the handler works from these
+    # for every record
+    log_file = Path(config['file']).resolve()
+    max_bytes = config['max_file_size_mb'] * 1024 * 1024
+    
     # Create logs directory if it doesn't exist
-    log_dir = os.path.dirname(config['file'])
-    os.makedirs(log_dir, exist_ok=True)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
     
     # Configure root logger
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, config['level'].upper()))
     
     # Remove existing handlers if any
+    shutdown_logging()
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
     
@@ -36,20 +197,35 @@ def setup_logging(config):
     console_handler.setFormatter(console_formatter)
     
     # Create file handler
-    file_handler = RotatingFileHandler(
-        config['file'],
-        maxBytes=config['max_file_size_mb'] * 1024 * 1024,
+    file_handler = CheapRotatingFileHandler(
+        str(log_file),
+        maxBytes=max_bytes,
         backupCount=config['backup_count']
     )
     file_handler.setLevel(logging.DEBUG)
     file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(file_formatter)
     
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    # Log calls only enqueue the record; a listener thread formats and writes
+    # it, so file I/O never blocks the audio or processing threads
+    global _listener
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    _listener = FlushingQueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    _listener.start()
     
     # Create our application logger
     app_logger = logging.getLogger('voice_transformer')
     
-    return app_logger 
\ No newline at end of file
+    return app_logger
+
+def shutdown_logging():
+    """
+    Stop the logging listener thread, writing out any queued records
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None 
\ No newline at end of file
@@ -9,19 +9,16 @@ optimized for Vietnamese speech.
 import os
 import sys
 import argparse
-import json
 import time
+import select
 import signal
+import threading
 from pathlib import Path
 
-from src.audio.input import AudioInput
-from src.audio.output import AudioOutput
-from src.audio.processing import AudioProcessor
-from src.transformation.pipeline import TransformationPipeline
 from src.cli.commands import CommandHandler
 from src.cli.display import Display
-from src.utils.config import load_config
-from src.utils.logging import setup_logging
+from src.utils.config import ConfigWatcher, load_config, save_config
+from src.utils.logging import setup_logging, shutdown_logging
 
 # Global flag for graceful shutdown
 running = True
@@ -32,93 +29,336 @@ def signal_handler(sig, frame):
     print("\nShutting down Voice Transformer...")
     running = False
 
-def parse_arguments():
+# Windows console events after which the process is killed once the handler
+# returns: CTRL_CLOSE_EVENT, CTRL_LOGOFF_EVENT and CTRL_SHUTDOWN_EVENT
+CONSOLE_CLOSE_EVENTS = frozenset({2, 5, 6})
+
+# How long a console close waits for cleanup (Windows kills the process after about 5 s)
+CONSOLE_CLOSE_TIMEOUT = 3.0
+
+# Set once main() has released the audio devices
+shutdown_complete = threading.Event()
+
+# Keeps the ctypes callback alive while it is registered with the console
+_console_ctrl_handler = None
+
+def install_console_ctrl_handler():
+    """
+    Shut down cleanly when the Windows console window is closed
+    
+    Closing the console does not raise SIGINT; Windows calls the registered
+    control handlers and terminates the process as soon as they return. The
+    handler asks the main loop to stop and waits for it to close the audio
+    devices, instead of leaving the driver to be torn down by the OS.
+    Ctrl+C and Ctrl+Break are passed on to Python's signal handlers.
+    """
+    global _console_ctrl_handler
+    import ctypes
+    from ctypes import wintypes
+    
+    def handler(event):
+        global running
+        if event not in CONSOLE_CLOSE_EVENTS:
+            return False
+        running = False
+        shutdown_complete.wait(CONSOLE_CLOSE_TIMEOUT)
+        return True
+    
+    routine = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.DWORD)(handler)
+    if ctypes.windll.kernel32.SetConsoleCtrlHandler(routine, True):
+        _console_ctrl_handler = routine
+
+# Commands that leave the application
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
+
+# How often the command prompt checks for a shutdown request while idle
+INPUT_POLL_INTERVAL = 0.1
+
+# Bytes requested per read from stdin, and input read but not yet returned
+# as a command line (POSIX only)
+INPUT_READ_SIZE = 4096
+_pending_input = bytearray()
+
+def read_command(prompt, idle=None):
+    """
+    Read one command line without blocking shutdown
+    
+    Waits for input in short intervals and checks the running flag in between,
+    so Ctrl+C ends the wait within INPUT_POLL_INTERVAL instead of after the
+    next Enter. Uses msvcrt on Windows, where select() does not work on stdin.
+    
+    Args:
+        prompt (str): Prompt to display
+        idle (callable, optional): Called after each interval without input. Defaults to None.
+        
+    Returns:
+        str: The line entered, or None if shutdown was requested
+    """
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    
+    if os.name == 'nt':
+        import msvcrt
+        chars = []
+        while running:
+            if not msvcrt.kbhit():
+                time.sleep(INPUT_POLL_INTERVAL / 2)
+                if idle is not None:
+                    idle()
+                continue
+            ch = msvcrt.getwche()
+            if ch in ('\r', '\n'):
+                sys.stdout.write('\n')
+                return ''.join(chars)
+            if ch == '\x03':
+                return None
+            if ch == '\b':
+                # getwche() echoes the backspace; blank out the erased character
+                if chars:
+                    chars.pop()
+                    sys.stdout.write(' \b')
+                    sys.stdout.flush()
+            else:
+                chars.append(ch)
+        return None
+    
+    # Read the descriptor directly: sys.stdin would buffer lines that select()
+    # can no longer see, leaving pasted or piped commands unread
+    fd = sys.stdin.fileno()
+    while running:
+        end = _pending_input.find(b'\n')
+        if end >= 0:
+            line = bytes(_pending_input[:end + 1])
+            del _pending_input[:end + 1]
+            return line.decode(sys.stdin.encoding or 'utf-8', errors='replace')
+        
+        ready, _, _ = select.select([fd], [], [], INPUT_POLL_INTERVAL)
+        if ready:
+            data = os.read(fd, INPUT_READ_SIZE)
+            if data:
+                _pending_input.extend(data)
+                continue
+            if not _pending_input:
+                raise EOFError
+            # Last line without a trailing newline
+            line = bytes(_pending_input)
+            _pending_input.clear()
+            return line.decode(sys.stdin.encoding or 'utf-8', errors='replace')
+        if idle is not None:
+            idle()
+    return None
+
+# Command line options as (flag, keyword arguments) pairs
+ARGUMENTS = (
+    ('--config', dict(type=str, default='config.json',
+                      help='Path to configuration file')),
+    ('--input-device', dict(type=int,
+                            help='Input device index')),
+    ('--output-device', dict(type=int,
+                             help='Output device index')),
+    ('--buffer-size', dict(type=int,
+                           help='Audio buffer size in samples')),
+    ('--sample-rate', dict(type=int,
+                           help='Audio sample rate in Hz')),
+    ('--pitch-shift', dict(type=float,
+                           help='Pitch shift amount in semitones')),
+    ('--formant-shift', dict(type=float,
+                             help='Formant shift factor')),
+    ('--save-config', dict(type=str,
+                           help='Save current configuration to specified file')),
+)
+
+def parse_arguments(argv=None):
     """Parse command line arguments"""
-    parser = argparse.ArgumentParser(description='Voice Transformer - Real-time voice transformation')
-    parser.add_argument('--config', type=str, default='config.json',
-                        help='Path to configuration file')
-    parser.add_argument('--input-device', type=int, 
-                        help='Input device index')
-    parser.add_argument('--output-device', type=int,
-                        help='Output device index')
-    parser.add_argument('--buffer-size', type=int,
-                        help='Audio buffer size in samples')
-    parser.add_argument('--sample-rate', type=int,
-                        help='Audio sample rate in Hz')
-    parser.add_argument('--pitch-shift', type=float,
-                        help='Pitch shift amount in semitones')
-    parser.add_argument('--formant-shift', type=float,
-                        help='Formant shift factor')
-    parser.add_argument('--save-config', type=str,
-                        help='Save current configuration to specified file')
-    return parser.parse_args()
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # Without arguments every option takes its default, so skip building a parser
+    if not argv:
+        return argparse.Namespace(**{
+            flag[2:].replace('-', '_'): kwargs.get('default') for flag, kwargs in ARGUMENTS
+        })
+    
+    # allow_abbrev=False: options must be spelled out, so no prefix matching
+    parser = argparse.ArgumentParser(description='Voice Transformer - Real-time voice transformation',
+                                     allow_abbrev=False)
+    for flag, kwargs in ARGUMENTS:
+        parser.add_argument(flag, **kwargs)
+    return parser.parse_args(argv)
+
+# Config section -> (command line argument, config key) pairs it can override
+SECTION_OVERRIDES = {
+    'audio': (
+        ('input_device', 'input_device'),
+        ('output_device', 'output_device'),
+        ('buffer_size', 'buffer_size'),
+        ('sample_rate', 'sample_rate'),
+    ),
+    'transformation': (
+        ('pitch_shift', 'pitch_shift'),
+        ('formant_shift', 'formant_shift'),
+    ),
+}
+
+def apply_overrides(args, config):
+    """
+    Override configuration values with the command line arguments that were given
+    
+    Args:
+        args (argparse.Namespace): Parsed command line arguments
+        config (dict): Configuration dictionary, modified in place
+    """
+    for section, fields in SECTION_OVERRIDES.items():
+        # Only the arguments actually given, merged into the section in one update
+        overrides = {key: value for attr, key in fields
+                     if (value := getattr(args, attr)) is not None}
+        if overrides:
+            config[section].update(overrides)
+
+# Transformation settings that a config file edit changes without a restart,
+# and the value types each accepts
+LIVE_SETTINGS = {
+    'pitch_shift': (int, float),
+    'formant_shift': (int, float),
+    'intensity': (int, float),
+    'preserve_tones': (bool,),
+}
+
+def read_live_settings(config):
+    """
+    Get the live settings from a config file's contents
+    
+    Args:
+        config (dict): Config file contents
+        
+    Returns:
+        dict: Setting name -> value, for the live settings present in the file
+        
+    Raises:
+        ValueError: If the file or its transformation section is not a JSON
+            object, or a live setting has the wrong type
+    """
+    if not isinstance(config, dict):
+        raise ValueError("configuration file is not a JSON object")
+    section = config.get('transformation', {})
+    if not isinstance(section, dict):
+        raise ValueError("'transformation' is not a JSON object")
+    
+    settings = {}
+    for key, types in LIVE_SETTINGS.items():
+        if key not in section:
+            continue
+        value = section[key]
+        # bool is an int subclass, so it must not pass as a number
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f"invalid value for {key}: {value!r}")
+        settings[key] = value if bool in types else float(value)
+    return settings
+
+def apply_config_changes(old_settings, new_config, pipeline):
+    """
+    Apply the live settings that differ between two versions of the config file
+    
+    Only settings edited in the file are applied, so command line overrides
+    stay in effect until the file changes that setting.
+    
+    Args:
+        old_settings (dict): Live settings of the previous file version
+        new_config (dict): New file contents
+        pipeline (TransformationPipeline): Pipeline to update
+        
+    Returns:
+        dict: Live settings of the new file version
+        
+    Raises:
+        ValueError: If the new file contents are invalid (see read_live_settings);
+            nothing is applied in that case
+    """
+    new_settings = read_live_settings(new_config)
+    changes = {key: value for key, value in new_settings.items()
+               if value != old_settings.get(key)}
+    if changes:
+        pipeline.update_parameters(**changes)
+    return new_settings
 
 def main():
     """Main application entry point"""
-    # Set up signal handlers for graceful shutdown
+    # Set up signal handlers for graceful shutdown before anything slow runs,
+    # so Ctrl+C is honored during startup too
     signal.signal(signal.SIGINT, signal_handler)
+    if os.name == 'nt':
+        signal.signal(signal.SIGBREAK, signal_handler)
+        install_console_ctrl_handler()
     
     # Parse command line arguments
     args = parse_arguments()
     
     # Load configuration
     config = load_config(args.config)
+    config_watcher = ConfigWatcher(args.config)
     
     # Override config with command line arguments
-    if args.input_device is not None:
-        config['audio']['input_device'] = args.input_device
-    if args.output_device is not None:
-        config['audio']['output_device'] = args.output_device
-    if args.buffer_size is not None:
-        config['audio']['buffer_size'] = args.buffer_size
-    if args.sample_rate is not None:
-        config['audio']['sample_rate'] = args.sample_rate
-    if args.pitch_shift is not None:
-        config['transformation']['pitch_shift'] = args.pitch_shift
-    if args.formant_shift is not None:
-        config['transformation']['formant_shift'] = args.formant_shift
+    apply_overrides(args, config)
     
     # Save configuration if requested
     if args.save_config:
-        with open(args.save_config, 'w') as f:
-            json.dump(config, f, indent=2)
-        print(f"Configuration saved to {args.save_config}")
+        if save_config(config, args.save_config):
+            print(f"Configuration saved to {args.save_config}")
+        else:
+            print(f"Failed to save configuration to {args.save_config}")
         return
     
+    # Import the audio and transformation stack only now, so --help and
+    # --save-config do not pay for loading PyAudio, librosa and torch
+    from src.audio.input import AudioInput
+    from src.audio.output import AudioOutput
+    from src.audio.processing import AudioProcessor
+    from src.transformation.pipeline import TransformationPipeline
+    
     # Set up logging
     logger = setup_logging(config['logging'])
     logger.info("Starting Voice Transformer")
     
     try:
+        ui_cfg = config['ui']
+        audio_cfg = config['audio']
+        xform_cfg = config['transformation']
+        sample_rate = audio_cfg['sample_rate']
+        buffer_size = audio_cfg['buffer_size']
+        channels = audio_cfg['channels']
+        
         # Initialize display
-        display = Display(refresh_rate_ms=config['ui']['refresh_rate_ms'],
-                         show_metrics=config['ui']['show_metrics'],
-                         color_output=config['ui']['color_output'])
+        display = Display(refresh_rate_ms=ui_cfg['refresh_rate_ms'],
+                         show_metrics=ui_cfg['show_metrics'],
+                         color_output=ui_cfg['color_output'])
         
         # Initialize audio components
         audio_input = AudioInput(
-            device_index=config['audio']['input_device'],
-            sample_rate=config['audio']['sample_rate'],
-            buffer_size=config['audio']['buffer_size'],
-            channels=config['audio']['channels']
+            device_index=audio_cfg['input_device'],
+            sample_rate=sample_rate,
+            buffer_size=buffer_size,
+            channels=channels
         )
         
         audio_output = AudioOutput(
-            device_index=config['audio']['output_device'],
-            sample_rate=config['audio']['sample_rate'],
-            buffer_size=config['audio']['buffer_size'],
-            channels=config['audio']['channels']
+            device_index=audio_cfg['output_device'],
+            sample_rate=sample_rate,
+            buffer_size=buffer_size,
+            channels=channels
         )
         
-        audio_processor = AudioProcessor()
+        audio_processor = AudioProcessor(
+            sample_rate=sample_rate,
+            buffer_size=buffer_size
+        )
         
         # Initialize transformation pipeline
         transformation_pipeline = TransformationPipeline(
-            model_path=config['transformation']['model_path'],
-            pitch_shift=config['transformation']['pitch_shift'],
-            formant_shift=config['transformation']['formant_shift'],
-            intensity=config['transformation']['intensity'],
-            preserve_tones=config['transformation']['preserve_tones']
+            model_path=xform_cfg['model_path'],
+            pitch_shift=xform_cfg['pitch_shift'],
+            formant_shift=xform_cfg['formant_shift'],
+            intensity=xform_cfg['intensity'],
+            preserve_tones=xform_cfg['preserve_tones']
         )
         
         # Initialize command handler
@@ -133,11 +373,39 @@ def main():
         display.welcome()
         command_handler.start_cli()
         
+        # Pick up config file edits at the display refresh cadence
+        file_config = config_watcher.get()
+        try:
+            file_settings = read_live_settings(file_config) if file_config is not None else {}
+        except ValueError:
+            file_settings = {}
+        check_interval = ui_cfg['refresh_rate_ms'] / 1000.0
+        next_check = time.monotonic() + check_interval
+        
+        def check_config():
+            nonlocal file_config, file_settings, next_check
+            now = time.monotonic()
+            if now < next_check:
+                return
+            next_check = now + check_interval
+            new_config = config_watcher.get()
+            if new_config is file_config:
+                return
+            file_config = new_config
+            try:
+                file_settings = apply_config_changes(file_settings, new_config, transformation_pipeline)
+            except Exception as e:
+                # Keep running with the last good settings until the file is fixed
+                logger.error("Ignoring configuration change: %s", e)
+        
         # Main application loop
         global running
         while running:
-            command = input("voice-transformer> ").strip().lower()
-            if command in ["exit", "quit", "q"]:
+            line = read_command("voice-transformer> ", idle=check_config)
+            if line is None:
+                break
+            command = line.strip().lower()
+            if command in EXIT_COMMANDS:
                 running = False
             else:
                 command_handler.process_command(command)
@@ -145,7 +413,7 @@ def main():
     except KeyboardInterrupt:
         pass
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.error("Error: %s", e)
         print(f"An error occurred: {e}")
     finally:
         # Cleanup
@@ -154,9 +422,13 @@ def main():
             audio_input.close()
         if 'audio_output' in locals():
             audio_output.close()
+        if 'audio_processor' in locals():
+            audio_processor.close()
         if 'transformation_pipeline' in locals():
             transformation_pipeline.close()
         print("Voice Transformer has been shut down.")
+        shutdown_logging()
+        shutdown_complete.set()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file